@@ -12,6 +12,36 @@ python manage.py migrate
 echo "==> Collecting static files"
 python manage.py collectstatic --noinput
 
+if [ "${GAME_WORKERS:-0}" -eq 0 ]; then
+    echo "==> Starting Uvicorn ASGI server"
+    # Utilisez exec pour que le processus Uvicorn remplace le processus shell, ce qui facilite la gestion des signaux et des arrêts propres.
+    exec uvicorn pong_project.asgi:application --host 0.0.0.0 --port 8000
+fi
+
+# Game workers : un processus par worker, chacun simule sa part des parties
+# (hachage cohérent sur un anneau fixe, voir game/sharding.py). Un worker
+# arrêté laisserait ses parties sans boucle de jeu : si un processus (worker
+# ou Uvicorn) s'arrête, on arrête les autres et le conteneur sort en erreur,
+# relancé par docker-compose (restart: unless-stopped).
+PIDS=()
+stop_all() {
+    kill -TERM "${PIDS[@]}" 2>/dev/null || true
+    wait
+}
+trap 'stop_all; exit 0' TERM INT
+
+for i in $(seq 0 $((GAME_WORKERS - 1))); do
+    echo "==> Starting game worker game-worker-$i"
+    python manage.py runworker "game-worker-$i" &
+    PIDS+=($!)
+done
+
 echo "==> Starting Uvicorn ASGI server"
-# Utilisez exec pour que le processus Uvicorn remplace le processus shell, ce qui facilite la gestion des signaux et des arrêts propres.
-exec uvicorn pong_project.asgi:application --host 0.0.0.0 --port 8000
+uvicorn pong_project.asgi:application --host 0.0.0.0 --port 8000 &
+PIDS+=($!)
+
+status=0
+wait -n "${PIDS[@]}" || status=$?
+echo "==> A game worker or Uvicorn exited (status $status), stopping the container"
+stop_all
+exit $(( status == 0 ? 1 : status ))
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GameConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'game'
+
+    def ready(self):
+        from . import signals  # enregistre les receivers post_save
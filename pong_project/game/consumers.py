@@ -1,29 +1,68 @@
 # game/consumers.py
 
+import asyncio
 import json
-import redis
-from django.conf import settings
+from urllib.parse import parse_qs
+from channels.consumer import AsyncConsumer
 from channels.generic.websocket import AsyncWebsocketConsumer
 from uuid import UUID
 # from asgiref.sync import sync_to_async
-from game.tasks import stop_game
+from game.tasks import start_game_loop, stop_game
+from game.manager import request_stop_game
+from game import fanout
+from game.mailbox import Mailbox
+from game.ratelimit import TokenBucket
 # from game.models import GameSession
 
-# from .game_loop.redis_utils import get_key
+from game.stats import ensure_stats_publisher
+from .game_loop.inbox import deliver_input, remote_inbox_channel
+from .game_loop.broadcast import server_time_ms
+from .game_loop.wire import MAX_INPUT_SEQ
 
-r = redis.Redis(
-    host=settings.REDIS_HOST,
-    port=settings.REDIS_PORT,
-    db=0
-)
+# Limites des messages envoyés par un client (par connexion)
+INPUT_RATE = 40         # messages/s acceptés dans la durée (2 joueurs au clavier en local)
+INPUT_BURST = 40
+REJECTED_RATE = 20      # messages refusés/s tolérés...
+REJECTED_BURST = 100    # ...au-delà, la connexion est fermée
+MAX_INPUT_SIZE = 256    # octets
+CLOSE_RATE_LIMITED = 4008
+RTT_SMOOTHING = 0.2     # poids d'une nouvelle mesure de RTT (moyenne glissante)
 
 class PongConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.game_id = self.scope['url_route']['kwargs']['game_id']
         self.group_name = f"pong_{self.game_id}"
+        # ?proto=bin : frames game_state binaires (voir game_loop/wire.py), JSON sinon
+        binary = parse_qs(self.scope.get('query_string', b'').decode()).get('proto') == ['bin']
+        self.frame_format = 'bytes' if binary else 'text'
+        # Canal de l'inbox quand la partie est simulée par un autre processus
+        self.inbox_channel = None
+        self.in_group = False  # membre du groupe Redis (voir fanout.join_remote)
+        # Débit des messages du client (voir receive)
+        self.input_bucket = TokenBucket(INPUT_RATE, INPUT_BURST)
+        self.rejected_bucket = TokenBucket(REJECTED_RATE, REJECTED_BURST)
+        self.inputs_received = 0
+        self.inputs_rejected = 0
+        self.rate_limited = False
+        # Latence mesurée par le ping/pong du client (voir handle_ping)
+        self.rtt_ms = None
+        self.clock_offset_ms = None
+        self.pings = 0
+        # Boîte d'envoi (game/mailbox.py) : alimentée par le groupe Redis ou directement
+        # par la boucle de jeu du même processus (game/fanout.py), vidée par writer
+        self.mailbox = Mailbox(self.frame_format)
+        self.writer = asyncio.create_task(self.write_messages())
 
         await self.accept()
-        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        ensure_stats_publisher()
+        fanout.register(self.game_id, self)
+        if not fanout.is_hosted(self.game_id):
+            await fanout.join_remote(self.game_id, self.channel_layer, self)
+            # La partie a pu démarrer ici pendant le group_add : on évite les doublons
+            if fanout.is_hosted(self.game_id):
+                await fanout.leave_remote(self.game_id, self.channel_layer, self)
+        # Le nouveau client a besoin de l'état complet avant les deltas
+        await self.request_keyframe()
         print(f"[PongConsumer] WebSocket connected for game_id={self.game_id}")
 
 
@@ -33,12 +72,18 @@ class PongConsumer(AsyncWebsocketConsumer):
     async def disconnect(self, close_code):
         # Si vous décidez de tout annuler dès la première déconnexion :
         print(f"[PongConsumer] => disconnect => stop_game({self.game_id})")
-        await stop_game(self.game_id)  # Annule la task asyncio côté server
+        await request_stop_game(self.game_id)  # Annule la task asyncio côté server (ou sur son game worker)
 
         # Optionnel: marquer la session en "cancelled" en base
         # await self.set_session_cancelled(self.game_id)
 
-        await self.channel_layer.group_discard(self.group_name, self.channel_name)
+        fanout.unregister(self.game_id, self)
+        if hasattr(self, 'writer'):
+            self.writer.cancel()
+            if self.mailbox.dropped:
+                print(f"[PongConsumer] game_id={self.game_id} : {self.mailbox.dropped} frames abandonnées (client lent)")
+        if hasattr(self, 'in_group'):
+            await fanout.leave_remote(self.game_id, self.channel_layer, self)
 
 
     # async def set_session_cancelled(self, game_id):
@@ -53,37 +98,152 @@ class PongConsumer(AsyncWebsocketConsumer):
     
 
     async def receive(self, text_data=None, bytes_data=None):
-        data = json.loads(text_data)
+        # Limite vérifiée avant tout décodage : le coût d'un client qui inonde reste borné
+        self.inputs_received += 1
+        if text_data is None or len(text_data) > MAX_INPUT_SIZE or not self.input_bucket.take():
+            await self.reject_input()
+            return
+        try:
+            data = json.loads(text_data)
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            await self.reject_input()
+            return
         action = data.get('action')
         player = data.get('player')
 
+        seq = data.get('seq', 0)  # numéro de séquence de l'entrée côté client
+        if isinstance(seq, bool) or not isinstance(seq, int) or not 0 <= seq <= MAX_INPUT_SEQ:
+            await self.reject_input()
+            return
+
         if action == 'start_move':
             direction = data.get('direction')  # 'up' ou 'down'
-            self.start_move_paddle(player, direction)
+            await self.start_move_paddle(player, direction, seq)
 
         elif action == 'stop_move':
-            self.stop_move_paddle(player)
+            await self.stop_move_paddle(player, seq)
+
+        elif action == 'request_keyframe':
+            await self.request_keyframe()
+
+        elif action == 'ping':
+            self.handle_ping(data)
 
-    def start_move_paddle(self, player, direction):
+    async def reject_input(self):
+        """Message ignoré (débit, taille, format) ; un client qui insiste est déconnecté."""
+        self.inputs_rejected += 1
+        if not self.rejected_bucket.take() and not self.rate_limited:
+            self.rate_limited = True
+            print(f"[PongConsumer] game_id={self.game_id} : trop de messages ({self.inputs_rejected} refusés), fermeture")
+            await self.close(code=CLOSE_RATE_LIMITED)
+
+    def handle_ping(self, data):
+        """
+        Synchronisation d'horloge façon NTP : le client envoie t0 (son horloge),
+        on répond t1 (réception) et t2 (envoi, posé par writer) sur l'horloge des
+        frames. Le client en déduit RTT et décalage, et renvoie ses dernières
+        mesures dans le ping suivant (statistiques par connexion).
+        """
+        t1 = server_time_ms()
+        t0, rtt, offset = data.get('t0'), data.get('rtt'), data.get('offset')
+        if not isinstance(t0, (int, float)):
+            return
+        if isinstance(rtt, (int, float)) and 0 <= rtt < 60000:
+            self.rtt_ms = rtt if self.rtt_ms is None else self.rtt_ms + RTT_SMOOTHING * (rtt - self.rtt_ms)
+        if isinstance(offset, (int, float)):
+            self.clock_offset_ms = offset
+        self.pings += 1
+        self.deliver({'type': 'pong', 't0': t0, 't1': t1})
+
+    def latency_stats(self):
+        return {
+            'rtt_ms': round(self.rtt_ms, 1) if self.rtt_ms is not None else None,
+            'clock_offset_ms': round(self.clock_offset_ms, 1) if self.clock_offset_ms is not None else None,
+            'pings': self.pings,
+        }
+
+    def input_stats(self):
+        return {
+            'inputs_received': self.inputs_received,
+            'inputs_rejected': self.inputs_rejected,
+            'rate_limited': self.rate_limited,
+        }
+
+    async def start_move_paddle(self, player, direction, seq):
         velocity = 0
         if direction == 'up':
             velocity = -8  # Ajustez la vitesse selon vos préférences
         elif direction == 'down':
             velocity = 8
 
-        r.set(f"{self.game_id}:paddle_{player}_velocity", velocity)
+        await self.send_input({'action': 'move', 'player': player, 'velocity': velocity, 'seq': seq})
         print(f"[PongConsumer] start_move_paddle: player={player}, velocity={velocity}")
 
-    def stop_move_paddle(self, player):
-        r.set(f"{self.game_id}:paddle_{player}_velocity", 0)
+    async def stop_move_paddle(self, player, seq):
+        await self.send_input({'action': 'move', 'player': player, 'velocity': 0, 'seq': seq})
         print(f"[PongConsumer] stop_move_paddle: player={player}")
 
-    # Handlers pour les événements du groupe
+    async def request_keyframe(self):
+        """La boucle de jeu enverra l'état complet a la prochaine frame."""
+        await self.send_input({'action': 'request_keyframe'})
+
+    async def send_input(self, message):
+        """Transmet une entrée a l'inbox de la partie (voir game_loop/inbox.py)."""
+        if message['action'] == 'move' and message['player'] not in ('left', 'right'):
+            return
+        message['type'] = 'game.input'
+        if deliver_input(self.game_id, message):
+            return
+        if self.inbox_channel is None:
+            self.inbox_channel = await remote_inbox_channel(self.game_id)
+        if self.inbox_channel:
+            await self.channel_layer.send(self.inbox_channel, message)
+        # Sinon la partie n'a pas encore démarré : sa première frame sera une keyframe
+
+    def deliver(self, message):
+        """Dépose un message dans la boîte d'envoi. Ne bloque jamais (appelée aussi par game/fanout.py)."""
+        if message['type'] == 'broadcast_game_state':
+            self.mailbox.put_frame(message)
+        else:
+            self.mailbox.put(message)
+
+    async def write_messages(self):
+        # Tâche dédiée : un client lent ne ralentit ni la boucle de jeu ni le channel layer
+        while True:
+            message = await self.mailbox.get()
+            await getattr(self, f"send_{message['type']}")(message)
+
+    # Handlers pour les événements du groupe : tout passe par la boîte d'envoi
     async def broadcast_game_state(self, event):
-        await self.send(json.dumps(event['data']))
-        # print(f"[PongConsumer] Broadcast game_state for game_id={self.game_id}")
+        self.deliver(event)
 
     async def game_over(self, event):
+        self.deliver(event)
+
+    async def countdown(self, event):
+        self.deliver(event)
+
+    # Envoi effectif au client (tâche writer)
+    async def send_pong(self, event):
+        await self.send(text_data=json.dumps({
+            'type': 'pong', 't0': event['t0'], 't1': event['t1'], 't2': server_time_ms()
+        }))
+
+    async def send_broadcast_game_state(self, event):
+        # Frame déjà sérialisée par la boucle de jeu (broadcast.py) : on la transmet telle quelle
+        frame = event.get(self.frame_format)
+        if frame is None:
+            # Frame sérialisée avant que la boucle ne connaisse ce format : la suivante le portera
+            return
+        if self.frame_format == 'bytes':
+            await self.send(bytes_data=frame)
+        else:
+            await self.send(text_data=frame)
+        # print(f"[PongConsumer] Broadcast game_state for game_id={self.game_id}")
+
+    async def send_game_over(self, event):
         winner = event['winner']
         looser = event['looser']
         # tournament_id = event['tournament_id']
@@ -98,69 +258,33 @@ class PongConsumer(AsyncWebsocketConsumer):
         # Envoyer le JSON au client WebSocket
         await self.send(text_data=json.dumps(response_data))
 
-    async def powerup_applied(self, event):
-        await self.send(json.dumps({
-            'type': 'powerup_applied',
-            'player': event['player'],
-            'effect': event['effect'],
-            'duration': event['duration']
-        }))
-        print(f"[PongConsumer] Broadcast powerup_applied for game_id={self.game_id}, player={event['player']}, effect={event['effect']}, duration={event['duration']}")
-
-    async def powerup_spawned(self, event):
-        await self.send(json.dumps({
-            'type': 'powerup_spawned',
-            'powerup': event['powerup']
-        }))
-        print(f"[PongConsumer] Broadcast powerup_spawned for game_id={self.game_id}")
-
-    async def countdown(self, event):
+    async def send_countdown(self, event):
         await self.send(json.dumps({
             'type': 'countdown',
             'countdown_nb': event['countdown_nb']
         }))
         print(f"[PongConsumer] Broadcast countdown for game_id={self.game_id}")
     
-    async def scored(self, event):
-        await self.send(json.dumps({
-            'type': 'scored',
-            'scoreMsg': event['scoreMsg']
-        }))
-        print(f"[PongConsumer] Broadcast countdown for game_id={self.game_id}")
-    
     # async def start_game(self, event):
     #     await self.send(json.dumps({
     #         'type': 'start_game',
     #     }))
     #     print(f"[PongConsumer] Broadcast start_game for game_id={self.game_id}")
 
-    async def powerup_expired(self, event):
-        await self.send(json.dumps({
-            'type': 'powerup_expired',
-            'powerup': event['powerup']
-        }))
-        print(f"[PongConsumer] Broadcast powerup_expired for game_id={self.game_id}")
-
-    async def bumper_spawned(self, event):
-        await self.send(json.dumps({
-            'type': 'bumper_spawned',
-            'bumper': event['bumper']
-        }))
-        print(f"[PongConsumer] Broadcast bumper_spawned for game_id={self.game_id}")
 
-    async def bumper_expired(self, event):
-        await self.send(json.dumps({
-            'type': 'bumper_expired',
-            'bumper': event['bumper']
-        }))
-        print(f"[PongConsumer] Broadcast bumper_expired for game_id={self.game_id}")
+# [IMPROVE] adapter le consummer  aux notifications envoyees par broadcast.py
 
-    async def collision_event(self, event):
-        await self.send(json.dumps({
-            'type': 'collision_event',
-            'collision': event['collision']
-        }))
-        print(f"[PongConsumer] Broadcast collision_event for game_id={self.game_id}")
 
+class GameWorkerConsumer(AsyncConsumer):
+    """
+    Consumer d'un game worker (python manage.py runworker game-worker-<i>) :
+    démarre et arrête les parties que le hachage cohérent lui attribue.
+    """
+    async def game_start(self, event):
+        game_id = event['game_id']
+        print(f"[GameWorkerConsumer] game.start pour game_id={game_id}")
+        asyncio.create_task(start_game_loop(game_id))
 
-# [IMPROVE] adapter le consummer  aux notifications envoyees par broadcast.py
\ No newline at end of file
+    async def game_stop(self, event):
+        print(f"[GameWorkerConsumer] game.stop pour game_id={event['game_id']}")
+        await stop_game(event['game_id'])
@@ -0,0 +1,132 @@
+# game/fanout.py
+#
+# Distribution locale des messages d'une partie (frames game_state, countdown,
+# game_over) quand la boucle de jeu et les PongConsumer de la partie tournent
+# dans le même processus, le cas courant sans game workers.
+#
+# Sans ce raccourci chaque frame passait par le channel layer Redis
+# (lookup du groupe, push dans la liste de chaque canal, BLPOP du consumer),
+# même pour un consumer voisin de la boucle de jeu.
+#
+#   - chaque PongConsumer s'enregistre ici (register / unregister) ;
+#   - le processus qui simule une partie l'"héberge" (host_game) : ses
+#     consumers locaux quittent le groupe Redis pong_<game_id> et reçoivent
+#     les messages directement dans leur file (PongConsumer.deliver) ;
+#   - group_send livre aux consumers locaux puis, via Redis, a ceux
+#     connectés a d'autres processus (les seuls encore dans le groupe).
+#
+# Membres distants : un consumer qui rejoint le groupe Redis (join_remote)
+# incrémente le compteur de son format de frame (REMOTE_FIELDS) dans le hash
+# de la partie, qu'il décrémente en le quittant (leave_remote). Le processus
+# hôte relit ces compteurs au plus toutes les REMOTE_REFRESH secondes (ou dès
+# qu'un consumer distant se manifeste, cf. remote_changed) : pas de publication
+# Redis sans membre distant, et la boucle de jeu ne sérialise les frames que
+# dans les formats utilisés (frame_formats).
+# Un compteur trop haut (processus tué) ne coûte que des publications inutiles.
+
+import time
+from game.game_loop.redis_utils import incr_key, incr_existing, get_many
+
+# Format d'une frame game_state ('text' : JSON, 'bytes' : binaire) -> compteur Redis
+REMOTE_FIELDS = {'text': "remote_text", 'bytes': "remote_bytes"}
+REMOTE_REFRESH = 1.0  # secondes
+
+_CONSUMERS = {}   # { game_id: set(PongConsumer) } consumers connectés a ce processus
+_HOSTED = set()   # game_id simulés par ce processus
+_REMOTE = {}      # { game_id: (formats des membres distants, échéance de relecture) } des parties hébergées
+
+def group_name(game_id):
+    return f"pong_{game_id}"
+
+def register(game_id, consumer):
+    _CONSUMERS.setdefault(str(game_id), set()).add(consumer)
+
+def unregister(game_id, consumer):
+    consumers = _CONSUMERS.get(str(game_id))
+    if consumers is not None:
+        consumers.discard(consumer)
+        if not consumers:
+            del _CONSUMERS[str(game_id)]
+
+def local_consumers(game_id):
+    return _CONSUMERS.get(str(game_id), ())
+
+def is_hosted(game_id):
+    return str(game_id) in _HOSTED
+
+async def host_game(game_id, channel_layer):
+    """La partie est simulée ici : ses consumers locaux passent au chemin direct."""
+    _HOSTED.add(str(game_id))
+    for consumer in list(local_consumers(game_id)):
+        await leave_remote(game_id, channel_layer, consumer)
+    await refresh_remote(game_id)
+
+def release_game(game_id):
+    _HOSTED.discard(str(game_id))
+    _REMOTE.pop(str(game_id), None)
+
+async def join_remote(game_id, channel_layer, consumer):
+    """Le consumer reçoit les messages de la partie par le groupe Redis."""
+    await channel_layer.group_add(group_name(game_id), consumer.channel_name)
+    await incr_key(game_id, REMOTE_FIELDS[consumer.frame_format], 1)
+    consumer.in_group = True
+
+async def leave_remote(game_id, channel_layer, consumer):
+    if not consumer.in_group:
+        return
+    consumer.in_group = False
+    await channel_layer.group_discard(group_name(game_id), consumer.channel_name)
+    # Partie terminée (hash supprimé par delete_game) : rien a décrémenter
+    await incr_existing(game_id, REMOTE_FIELDS[consumer.frame_format], -1)
+
+async def refresh_remote(game_id):
+    counts = await get_many(game_id, list(REMOTE_FIELDS.values()))
+    # Un compteur négatif (décrément perdu dans une course) compte pour 0
+    formats = frozenset(fmt for fmt, count in zip(REMOTE_FIELDS, counts) if int(count or 0) > 0)
+    _REMOTE[str(game_id)] = (formats, time.monotonic() + REMOTE_REFRESH)
+
+def remote_changed(game_id):
+    """Un consumer distant vient de se manifester : relecture du compteur au prochain envoi."""
+    if str(game_id) in _REMOTE:
+        _REMOTE[str(game_id)] = (_REMOTE[str(game_id)][0], 0)
+
+async def remote_formats(game_id):
+    """Formats de frame des membres distants (tous si la partie n'est pas hébergée ici)."""
+    if not is_hosted(game_id):
+        return frozenset(REMOTE_FIELDS)
+    formats, refresh_at = _REMOTE.get(str(game_id), (None, 0))
+    if time.monotonic() >= refresh_at:
+        await refresh_remote(game_id)
+        formats = _REMOTE[str(game_id)][0]
+    return formats
+
+async def frame_formats(game_id):
+    """Formats dans lesquels sérialiser les frames game_state de la partie."""
+    formats = set(await remote_formats(game_id))
+    formats.update(consumer.frame_format for consumer in local_consumers(game_id))
+    return formats
+
+def hosted_games():
+    return sorted(_HOSTED)
+
+def connection_stats():
+    """Compteurs de chaque connexion de ce processus (frames, entrées, latence)."""
+    return [
+        dict(consumer.mailbox.stats(), **consumer.input_stats(), **consumer.latency_stats(),
+             game_id=game_id, channel=consumer.channel_name)
+        for game_id, consumers in _CONSUMERS.items()
+        for consumer in consumers
+    ]
+
+async def group_send(channel_layer, game_id, message):
+    """
+    Equivalent de channel_layer.group_send(pong_<game_id>, message) : livraison
+    directe aux consumers locaux, Redis pour les autres.
+    """
+    if is_hosted(game_id):
+        for consumer in local_consumers(game_id):
+            consumer.deliver(message)
+        # Aucun consumer dans un autre processus : pas de publication Redis
+        if not await remote_formats(game_id):
+            return
+    await channel_layer.group_send(group_name(game_id), message)
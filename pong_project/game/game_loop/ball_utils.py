@@ -1,33 +1,31 @@
 # game/game_loop/ball_utils.py
-from .redis_utils import get_key, set_key, delete_key
 from .dimensions_utils import get_terrain_rect
-import time
+from . import timers
 import math
 import random
-import asyncio
-from game.tasks import register_subtask
 
 BALL_MIN_SPEED = 1
 BALL_MAX_SPEED = 20
+STICKY_HOLD = 1.0  # secondes pendant lesquelles la balle reste collée
 # -------------- BALL : UPDATE OBJECTS  --------------------
-def move_ball(game_id, ball):
-    ball.x = float(get_key(game_id, "ball_x")) + float(get_key(game_id, "ball_vx"))
-    ball.y = float(get_key(game_id, "ball_y")) + float(get_key(game_id, "ball_vy"))
-    update_ball_redis(game_id, ball)
+def move_ball(state):
+    ball = state.ball
+    state.ball_from = (ball.x, ball.y)
+    ball.x += ball.speed_x * state.step_scale
+    ball.y += ball.speed_y * state.step_scale
 
 
-def reset_ball(game_id, ball):
-    terrain_rect = get_terrain_rect(game_id)
+def reset_ball(state):
+    ball = state.ball
+    terrain_rect = get_terrain_rect(state.game_id)
     center_x = terrain_rect['left'] + terrain_rect['width'] // 2
     center_y = terrain_rect['top'] + terrain_rect['height'] // 2
 
-    # Get the initial ball speed multiplier from Redis / added
-    speed_multiplier = int(get_key(game_id, "initial_ball_speed_multiplier"))
+    speed_multiplier = state.initial_ball_speed
     initial_speed_x = random.choice([-1, 1]) * speed_multiplier  # Base speed * multiplier / modified
     initial_speed_y = random.choice([-1, 1]) * speed_multiplier
 
     ball.reset(center_x, center_y, initial_speed_x, initial_speed_y) #modified
-    update_ball_redis(game_id, ball)
 
     print(f"[game_loop.py] Ball reset to ({ball.x}, {ball.y}) with speed ({ball.speed_x}, {ball.speed_y})")
 
@@ -99,17 +97,12 @@ def reset_ball(game_id, ball):
 #     update_ball_redis(game_id, ball)
 #     print(f"[game_loop.py] Ball started with speed ({ball.speed_x}, {ball.speed_y})")
 
-def move_ball_sticky(game_id, paddle_left, paddle_right, ball):
-    stuck_side = get_key(game_id, "ball_stuck_side").decode('utf-8')  # 'left' ou 'right'
-    
-    # Récupérer la raquette correspondante
-    if stuck_side == 'left':
-        current_paddle = paddle_left
-    else:
-        current_paddle = paddle_right
+def move_ball_sticky(state):
+    ball = state.ball
+    stuck_side = state.stuck_side  # 'left' ou 'right'
 
-    # Calculer y en fonction de sticky_relative_pos_<side>
-    rel_pos = float(get_key(game_id, f"sticky_relative_pos_{stuck_side}") or 0)
+    # Récupérer la raquette correspondante
+    current_paddle = state.get_paddle(stuck_side)
 
     # Mettre la balle à la nouvelle position
     # X = collée contre la raquette
@@ -119,34 +112,29 @@ def move_ball_sticky(game_id, paddle_left, paddle_right, ball):
         ball.x = current_paddle.x - ball.size
 
     # Y = (paddle.y + rel_pos)
-    ball.y = current_paddle.y + rel_pos
-
-    # Vérifier si on doit la relâcher (ex: après 1s)
-    start_t = float(get_key(game_id, f"sticky_start_time_{stuck_side}") or 0)
-    if time.time() - start_t >= 1.0:
-        # Relâcher la balle avec un petit boost
-        release_ball_sticky(game_id, current_paddle, stuck_side, ball)
+    ball.y = current_paddle.y + state.sticky_relative_pos
+    state.ball_from = (ball.x, ball.y)
+    # Relâchement : échéance 'sticky_release:<side>' (powerups_utils.end_effect)
 
 
 
-# -------------- BALL : UPDATE REDIS KEYS  --------------------
-def stick_ball_to_paddle(game_id, stuck_side, current_paddle, ball):
+# -------------- BALL : STICKY STATE  --------------------
+def stick_ball_to_paddle(state, stuck_side, current_paddle):
     """
     Colle la balle sur la raquette <stuck_side>.
     """
+    ball = state.ball
     print(f"[sticky] stick ball to {stuck_side} paddle")
-    # Calcul de la position relative
-    relative_pos = ball.y - current_paddle.y
 
-    # Stocker la vitesse originale de la balle pour la remettre plus tard (facultatif)
-    set_key(game_id, "ball_original_vx", ball.speed_x)
-    set_key(game_id, "ball_original_vy", ball.speed_y)
+    # Stocker la vitesse originale de la balle pour la remettre plus tard
+    state.ball_original_speed = (ball.speed_x, ball.speed_y)
 
-    # Indiquer en Redis que la balle est collée à cette raquette
-    set_key(game_id, "ball_stuck", 1)
-    set_key(game_id, "ball_stuck_side", stuck_side)
-    set_key(game_id, f"sticky_relative_pos_{stuck_side}", relative_pos)
-    set_key(game_id, f"sticky_start_time_{stuck_side}", time.time())
+    # Indiquer que la balle est collée à cette raquette
+    state.ball_stuck = True
+    state.stuck_side = stuck_side
+    state.sticky_relative_pos = ball.y - current_paddle.y
+    # Relâchée après STICKY_HOLD, en ticks de simulation (sauvegardé avec le snapshot)
+    timers.schedule(state, f'sticky_release:{stuck_side}', STICKY_HOLD)
 
     # Mettre la balle immobile
     ball.speed_x = 0
@@ -158,47 +146,39 @@ def stick_ball_to_paddle(game_id, stuck_side, current_paddle, ball):
     else:
         ball.x = current_paddle.x - ball.size
 
-def release_ball_sticky(game_id, current_paddle, stuck_side, ball):
+def release_ball_sticky(state, stuck_side):
     print(f"[sticky] Releasing ball from {stuck_side} paddle")
-    # on conserve l'ancienne
+    ball = state.ball
 
-    # On récupère la vitesse originale (si on l'avait stockée)
-    ball.speed_x = float(get_key(game_id, "ball_original_vx") or BALL_MIN_SPEED)
-    ball.speed_y = float(get_key(game_id, "ball_original_vy") or BALL_MIN_SPEED)
+    # On récupère la vitesse originale
+    ball.speed_x, ball.speed_y = state.ball_original_speed or (BALL_MIN_SPEED, BALL_MIN_SPEED)
 
     # on donne le status speed boosted pour la rendre plus rapide lors de la prochaine collision avec le paddle
-    set_key(game_id, "ball_speed_boosted", 1)
-    # manage_ball_speed_and_angle(game_id, current_paddle, stuck_side, ball)
+    state.ball_speed_boosted = True
 
-    # Nettoyage des cles ayant permis a la balle de stuck
-    delete_key(game_id, "ball_stuck")
-    delete_key(game_id, "ball_stuck_side")
-    delete_key(game_id, f"sticky_relative_pos_{stuck_side}")
-    delete_key(game_id, f"sticky_start_time_{stuck_side}")
-    delete_key(game_id, "ball_original_vx")
-    delete_key(game_id, "ball_original_vy")
+    # Nettoyage de l'état ayant permis a la balle de stuck
+    state.ball_stuck = False
+    state.stuck_side = None
+    state.sticky_relative_pos = 0
+    state.ball_original_speed = None
 
     # Nettoyer le flag sticky de la raquette
-    delete_key(game_id, f"paddle_{stuck_side}_sticky")
+    state.effects[stuck_side].discard('sticky')
 
-# -------------- BALL : UPDATE REDIS GENERAL KEYS --------------------
+# -------------- BALL : SPEED & ANGLE --------------------
 
-def manage_ball_speed_and_angle(game_id, current_paddle, paddle_side, ball):
-    
-    ball_already_boosted = get_key(game_id, "ball_speed_already_boosted")
-    ball_speed_boosted = get_key(game_id, "ball_speed_boosted")
-    if ball_already_boosted and ball_already_boosted.decode('utf-8') == '1':
-        ball.speed_x = float(get_key(game_id, "ball_speed_x_before_boost") or BALL_MIN_SPEED)
-        ball.speed_y = float(get_key(game_id, "ball_speed_y_before_boost") or BALL_MIN_SPEED)
-        delete_key(game_id, "ball_speed_x_before_boost")
-        delete_key(game_id, "ball_speed_y_before_boost")
-        delete_key(game_id, "ball_speed_already_boosted")
-    
-    if ball_speed_boosted and ball_speed_boosted.decode('utf-8') == '1':
-        set_key(game_id, "ball_speed_x_before_boost", ball.speed_x)
-        set_key(game_id, "ball_speed_y_before_boost", ball.speed_y)
-        set_key(game_id, "ball_speed_already_boosted", 1)
-        delete_key(game_id, "ball_speed_boosted")
+def manage_ball_speed_and_angle(state, current_paddle, paddle_side):
+    ball = state.ball
+
+    if state.ball_speed_already_boosted:
+        ball.speed_x, ball.speed_y = state.ball_speed_before_boost or (BALL_MIN_SPEED, BALL_MIN_SPEED)
+        state.ball_speed_before_boost = None
+        state.ball_speed_already_boosted = False
+
+    if state.ball_speed_boosted:
+        state.ball_speed_before_boost = (ball.speed_x, ball.speed_y)
+        state.ball_speed_already_boosted = True
+        state.ball_speed_boosted = False
         tmp_speed = math.hypot(ball.speed_x, ball.speed_y) * 2
     else :
         tmp_speed = math.hypot(ball.speed_x, ball.speed_y) + 0.3
@@ -219,11 +199,3 @@ def manage_ball_speed_and_angle(game_id, current_paddle, paddle_side, ball):
         ball.speed_x = -new_speed_x
 
     ball.speed_y = new_speed * math.sin(angle)
-
-
-
-def update_ball_redis(game_id, ball):
-    set_key(game_id, "ball_x", ball.x)
-    set_key(game_id, "ball_y", ball.y)
-    set_key(game_id, "ball_vx", ball.speed_x)
-    set_key(game_id, "ball_vy", ball.speed_y)
\ No newline at end of file
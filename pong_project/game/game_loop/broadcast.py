@@ -1,39 +1,120 @@
 # game/game_loop/broadcast.py
 
+import json
+import time
 from channels.layers import get_channel_layer
-from .redis_utils import get_key
+from game.fanout import group_send, frame_formats
+from .wire import effects_bitmask, pack_game_state
+
+# Protocole game_state :
+#  - keyframe ('keyframe': True) : l'état complet, a la connexion d'un client,
+#    sur demande (request_keyframe) et toutes les KEYFRAME_INTERVAL frames ;
+#  - entre deux : seulement les champs qui ont changé depuis la frame précédente.
+# Chaque frame porte 'seq' (+1 par frame) : un trou => le client redemande une keyframe.
+# La frame est sérialisée UNE fois ici, seulement dans les formats des clients
+# connectés (texte JSON et/ou binaire, voir wire.py et fanout.frame_formats) :
+# le PongConsumer transmet tel quel le format de son client.
+# Chaque frame porte aussi le tick serveur et 't' (horloge monotone du serveur, ms)
+# pour que le client interpole entre deux frames.
+KEYFRAME_INTERVAL = 90
+
+def server_time_ms():
+    """Horloge des frames ('t') et du ping/pong des consumers."""
+    return round(time.monotonic() * 1000, 1)
+
+def set_broadcast_rate(state, rate, tick_rate):
+    """La simulation reste a tick_rate ; on n'envoie que rate frames par seconde."""
+    state.broadcast_interval = tick_rate / min(rate, tick_rate)
+    state.next_broadcast_tick = state.tick
+
+def broadcast_due(state):
+    """True si une frame doit partir a ce tick (a appeler une fois par réveil de la boucle)."""
+    if state.tick < state.next_broadcast_tick:
+        return False
+    state.next_broadcast_tick += state.broadcast_interval
+    if state.next_broadcast_tick <= state.tick:
+        # Retard (rattrapage, pause après un but) : on repart de maintenant
+        state.next_broadcast_tick = state.tick + state.broadcast_interval
+    return True
+
+def frame_due(state):
+    """
+    Une frame part a la cadence d'envoi (sauf pendant la pause après un but),
+    ou dès qu'il y a des événements en attente.
+    """
+    due = not state.pending_scorer and broadcast_due(state)
+    return due or bool(state.events)
 
 
 # --------- GAME STATE : NOTIFICATIONS -----------
-async def broadcast_game_state(game_id, channel_layer, paddle_left, paddle_right, ball, powerup_orbs, bumpers):
+async def broadcast_game_state(state, channel_layer):
     """
-    Envoie l'état actuel du jeu aux clients via WebSocket.
+    Envoie l'état actuel du jeu aux clients via WebSocket (keyframe ou delta).
     """
+    data = build_game_state(state)
+    state.frame_seq += 1
+
+    if (state.keyframe_requested or state.last_frame is None
+            or state.frame_seq - state.last_keyframe_seq >= KEYFRAME_INTERVAL):
+        frame = dict(data, keyframe=True)
+        state.last_keyframe_seq = state.frame_seq
+        state.keyframe_requested = False
+    else:
+        last_frame = state.last_frame
+        frame = {key: value for key, value in data.items() if last_frame.get(key) != value}
+        frame['type'] = 'game_state'
+
+    timing = {
+        'seq': state.frame_seq,
+        'tick': state.tick,
+        't': server_time_ms(),
+    }
+    frame.update(timing)
+    state.last_frame = data
+
+    # Événements accumulés depuis la frame précédente
+    events = state.events
+    state.events = []
+    if events:
+        frame['events'] = events
+
+    message = {
+        'type': 'broadcast_game_state',
+        # Pour la boîte d'envoi des consumers (game/mailbox.py)
+        'keyframe': 'keyframe' in frame,
+        'reliable': bool(events)
+    }
+    formats = await frame_formats(state.game_id)
+    if 'text' in formats:
+        message['text'] = json.dumps(frame)
+    if 'bytes' in formats:
+        message['bytes'] = pack_game_state(dict(data, events=events, **timing))
+    await group_send(channel_layer, state.game_id, message)
+
+def build_game_state(state):
+    """État complet du jeu tel qu'envoyé dans une keyframe."""
+    ball = state.ball
+    paddle_left = state.paddle_left
+    paddle_right = state.paddle_right
+
     # Récupérer les états des power-ups
     powerups_data = []
-    for powerup_orb in powerup_orbs:
-        active = get_key(game_id, f"powerup_{powerup_orb.effect_type}_active" or 0)
-        if active and active.decode('utf-8') == '1':
-            x = float(get_key(game_id, f"powerup_{powerup_orb.effect_type}_x") or 0)
-            y = float(get_key(game_id, f"powerup_{powerup_orb.effect_type}_y") or 0)
+    for powerup_orb in state.powerup_orbs:
+        if powerup_orb.active:
             powerups_data.append({
                 'type': powerup_orb.effect_type,
-                'x': x,
-                'y': y,
+                'x': powerup_orb.x,
+                'y': powerup_orb.y,
                 'color': list(powerup_orb.color)  # Convertir en liste pour JSON
             })
 
     # Récupérer les états des bumpers
-    # print(f"[game_loop.py] bumpers to send: {bumpers}")
     bumpers_data = []
-    for bumper in bumpers:
-        active = get_key(game_id, f"bumper_{bumper.x}_{bumper.y}_active" or 0)
-        if active and active.decode('utf-8') == '1':
-            x = float(get_key(game_id, f"bumper_{bumper.x}_{bumper.y}_x") or 0)
-            y = float(get_key(game_id, f"bumper_{bumper.x}_{bumper.y}_y") or 0)
+    for bumper in state.bumpers:
+        if bumper.active:
             bumpers_data.append({
-                'x': x,
-                'y': y,
+                'x': bumper.x,
+                'y': bumper.y,
                 'size': bumper.size,
                 'color': list(bumper.color)  # Convertir en liste pour JSON
             })
@@ -50,147 +131,126 @@ async def broadcast_game_state(game_id, channel_layer, paddle_left, paddle_right
         'paddle_width': paddle_left.width,
         'paddle_left_height': paddle_left.height,
         'paddle_right_height': paddle_right.height,
-        'score_left': int(get_key(game_id, "score_left") or 0),
-        'score_right': int(get_key(game_id, "score_right") or 0),
+        'score_left': state.score['left'],
+        'score_right': state.score['right'],
         'powerups': powerups_data,
         'bumpers': bumpers_data,
-        'flash_effect': bool(get_key(game_id, f"flash_effect"))
+        'flash_effect': state.flash_effect,
+        'effects': effects_bitmask(state),
+        # Dernière entrée appliquée par joueur (réconciliation côté client)
+        'input_seq_left': state.input_seq['left'],
+        'input_seq_right': state.input_seq['right']
     }
     # IMPROVE le flash effect peut etre renvoye en notif powerup applied
-
-    await channel_layer.group_send(f"pong_{game_id}", {
-        'type': 'broadcast_game_state',
-        'data': data
-    })
+    return data
     # print(f"[game_loop.py] Broadcast game_state for game_id={game_id}")
 
 
 
 
+# --------- ÉVÉNEMENTS DU TICK -----------
+# Collisions, spawns/expirations et buts ne font plus chacun leur group_send :
+# ils sont accumulés dans state.events et partent dans la frame game_state du
+# tick ('events'), soit au plus un group_send par partie et par tick.
+def queue_event(state, event):
+    state.events.append(event)
+
 # --------- POWER UPS : NOTIFICATIONS -----------
-async def notify_powerup_spawned(game_id, powerup_orb):
-    channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
-        {
-            'type': 'powerup_spawned',
-            'powerup': {
-                'type': powerup_orb.effect_type,
-                'x': powerup_orb.x,
-                'y': powerup_orb.y,
-                'color': list(powerup_orb.color)
-            }
+def notify_powerup_spawned(state, powerup_orb):
+    queue_event(state, {
+        'type': 'powerup_spawned',
+        'powerup': {
+            'type': powerup_orb.effect_type,
+            'x': powerup_orb.x,
+            'y': powerup_orb.y,
+            'color': list(powerup_orb.color)
         }
-    )
+    })
 
 async def notify_countdown(game_id, countdown_nb):
     channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
+    await group_send(
+        channel_layer, game_id,
         {
             'type': 'countdown',
             'countdown_nb': countdown_nb
         }
     )
 
-async def notify_scored(game_id):
-    channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
-        {
-            'type': 'scored',
-            'scoreMsg': 'GOAL'
-        }
-    )
+def notify_scored(state):
+    queue_event(state, {
+        'type': 'scored',
+        'scoreMsg': 'GOAL'
+    })
 
 
-async def notify_powerup_applied(game_id, player, effect, effect_duration):
-    channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
-        {
-            'type': 'powerup_applied',
-            'player': player,
-            'effect': effect,
-            'duration': effect_duration
-        }
-    )
+def notify_powerup_applied(state, player, effect, effect_duration):
+    queue_event(state, {
+        'type': 'powerup_applied',
+        'player': player,
+        'effect': effect,
+        'duration': effect_duration
+    })
 
-async def notify_powerup_expired(game_id, powerup_orb):
-    channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
-        {
-            'type': 'powerup_expired',
-            'powerup': {
-                'type': powerup_orb.effect_type,
-                'x': powerup_orb.x,
-                'y': powerup_orb.y
-            }
+def notify_powerup_expired(state, powerup_orb):
+    queue_event(state, {
+        'type': 'powerup_expired',
+        'powerup': {
+            'type': powerup_orb.effect_type,
+            'x': powerup_orb.x,
+            'y': powerup_orb.y
         }
-    )
+    })
 
 # --------- BUMPERS : NOTIFICATIONS -----------
-async def notify_bumper_spawned(game_id, bumper):
-    channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
-        {
-            'type': 'bumper_spawned',
-            'bumper': {
-                'x': bumper.x,
-                'y': bumper.y,
-            }
+def notify_bumper_spawned(state, bumper):
+    queue_event(state, {
+        'type': 'bumper_spawned',
+        'bumper': {
+            'x': bumper.x,
+            'y': bumper.y,
         }
-    )
+    })
 
 
-async def notify_bumper_expired(game_id, bumper):
-    channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
-        {
-            'type': 'bumper_expired',
-            'bumper': {
-                'x': bumper.x,
-                'y': bumper.y
-            }
+def notify_bumper_expired(state, bumper):
+    queue_event(state, {
+        'type': 'bumper_expired',
+        'bumper': {
+            'x': bumper.x,
+            'y': bumper.y
         }
-    )
+    })
 
 # --------- COLLISIONS : NOTIFICATIONS -----------
-async def notify_collision(game_id, collision_info):
-    channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
-        {
-            'type': 'collision_event',
-            'collision': collision_info
-        }
-    )
+def notify_collision(state, collision_info):
+    queue_event(state, {
+        'type': 'collision_event',
+        'collision': collision_info
+    })
 
-async def notify_paddle_collision(game_id, paddle_side, ball):
+def notify_paddle_collision(state, paddle_side, ball):
     collision_info = {
         'type': 'paddle_collision',
         'paddle_side': paddle_side,
         'new_speed_x': ball.speed_x,
         'new_speed_y': ball.speed_y,
     }
-    await notify_collision(game_id, collision_info)
+    notify_collision(state, collision_info)
 
     print(f"[collisions.py] Ball collided with {paddle_side} paddle. New speed: ({ball.speed_x}, {ball.speed_y})")
 
-async def notify_border_collision(game_id, border_side, ball):
+def notify_border_collision(state, border_side, ball):
     collision_info = {
         'type': 'border_collision',
         'border_side': border_side,
         'coor_x_collision': ball.x,
     }
-    await notify_collision(game_id, collision_info)
+    notify_collision(state, collision_info)
 
     print(f"[collisions.py] Ball collided with {border_side} border at coor x = {ball.x}.")
 
-async def notify_bumper_collision(game_id, bumper, ball):
+def notify_bumper_collision(state, bumper, ball):
     collision_info = {
         'type': 'bumper_collision',
         'bumper_x': bumper.x,
@@ -198,7 +258,7 @@ async def notify_bumper_collision(game_id, bumper, ball):
         'new_speed_x': ball.speed_x,
         'new_speed_y': ball.speed_y,
     }
-    await notify_collision(game_id, collision_info)
+    notify_collision(state, collision_info)
 
 
 
@@ -212,8 +272,8 @@ async def notify_game_finished(game_id, tournament_id, winner, looser):
 
     print(f"[broadcast.py] notify_game_finished winner: {winner_serializable} looser: {looser_serializable} tournament_id: {tournament_id}")
     channel_layer = get_channel_layer()
-    await channel_layer.group_send(
-        f"pong_{game_id}",
+    await group_send(
+        channel_layer, game_id,
         {
             'type': 'game_over',
             'tournament_id': str(tournament_id),
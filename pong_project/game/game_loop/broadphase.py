@@ -0,0 +1,65 @@
+# game/game_loop/broadphase.py
+#
+# Index spatial des obstacles actifs (bumpers et orbes) pour les collisions
+# de la balle (collisions.handle_bumper_collision / handle_powerup_collision).
+#
+# Avant, chaque tick testait la balle contre tous les bumpers et toutes les
+# orbes (math.hypot). Ici la grille uniforme (cases de CELL_SIZE) associe a
+# chaque case les obstacles dont le disque, élargi du rayon de la balle, la
+# recouvre. Elle n'est reconstruite que quand state.obstacles_version change
+# (spawn, ramassage, expiration) ; a chaque tick seules les cases traversées
+# par la balle pendant le tick sont consultées (une, parfois deux : le trajet
+# d'un tick est court devant CELL_SIZE), puis le test exact est fait sur
+# leurs quelques obstacles.
+
+CELL_SIZE = 50
+
+class ObstacleGrid:
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.bumpers = {}  # { (colonne, ligne): [Bumper] }
+        self.orbs = {}     # { (colonne, ligne): [PowerUpOrb] }
+        self.version = None
+
+    def sync(self, state):
+        """Reconstruit la grille si des obstacles sont apparus ou ont disparu depuis."""
+        if self.version == state.obstacles_version:
+            return
+        self.bumpers = self.index(state.bumpers, state.ball.size)
+        self.orbs = self.index(state.powerup_orbs, state.ball.size)
+        self.version = state.obstacles_version
+
+    def index(self, objects, reach):
+        cells = {}
+        size = self.cell_size
+        for obj in objects:
+            if not obj.active:
+                continue
+            radius = obj.size + reach
+            for column in range(int((obj.x - radius) // size), int((obj.x + radius) // size) + 1):
+                for row in range(int((obj.y - radius) // size), int((obj.y + radius) // size) + 1):
+                    cells.setdefault((column, row), []).append(obj)
+        return cells
+
+    def along(self, cells, from_x, from_y, to_x, to_y):
+        """Obstacles des cases du rectangle englobant le trajet (sans doublon)."""
+        size = self.cell_size
+        first_column, last_column = sorted((int(from_x // size), int(to_x // size)))
+        first_row, last_row = sorted((int(from_y // size), int(to_y // size)))
+        if first_column == last_column and first_row == last_row:
+            return cells.get((first_column, first_row), ())
+        found = {}
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                found.update(dict.fromkeys(cells.get((column, row), ())))
+        return list(found)
+
+    def bumpers_along(self, state, from_x, from_y, to_x, to_y):
+        """Bumpers que la balle peut toucher sur son trajet du tick."""
+        self.sync(state)
+        return self.along(self.bumpers, from_x, from_y, to_x, to_y)
+
+    def orbs_along(self, state, from_x, from_y, to_x, to_y):
+        """Orbes que la balle peut ramasser sur son trajet du tick."""
+        self.sync(state)
+        return self.along(self.orbs, from_x, from_y, to_x, to_y)
@@ -3,13 +3,55 @@
 import math
 import random
 import time
-from asgiref.sync import sync_to_async
-from .ball_utils import  stick_ball_to_paddle, manage_ball_speed_and_angle, update_ball_redis
-from .redis_utils import get_key, set_key, delete_key
+from .ball_utils import  stick_ball_to_paddle, manage_ball_speed_and_angle
 from .powerups_utils import apply_powerup
 from .broadcast import notify_paddle_collision, notify_border_collision, notify_bumper_collision, notify_powerup_applied
 
 MIN_SPEED = 1.0
+TERRAIN_TOP = 50
+TERRAIN_BOTTOM = 350
+
+# Détection continue : chaque test suit le trajet de la balle pendant le tick,
+# de state.ball_from (position de départ, ou dernier point d'impact) a sa
+# position actuelle, au lieu de la seule position de fin de tick. Une balle
+# rapide ne traverse plus une raquette ou un bumper entre deux ticks, et le
+# résultat ne dépend plus de TICK_RATE. Après un rebond, la balle parcourt la
+# fin du trajet (1 - t) avec sa nouvelle vitesse.
+
+def segment_hit(from_x, from_y, to_x, to_y, cx, cy, radius):
+    """
+    Fraction t (0..1) du trajet a laquelle la balle entre dans le cercle
+    (cx, cy, radius), ou None. t = 0 si elle y est déjà en s'en rapprochant.
+    """
+    dx, dy = to_x - from_x, to_y - from_y
+    fx, fy = from_x - cx, from_y - cy
+    b = fx * dx + fy * dy
+    if b >= 0:
+        return None  # la balle s'éloigne du centre
+    c = fx * fx + fy * fy - radius * radius
+    if c <= 0:
+        return 0.0
+    a = dx * dx + dy * dy
+    disc = b * b - a * c
+    if disc < 0:
+        return None
+    t = (-b - math.sqrt(disc)) / a
+    return t if t <= 1 else None
+
+def segment_touches(from_x, from_y, to_x, to_y, cx, cy, radius):
+    """Le trajet passe-t-il a moins de radius de (cx, cy) ?"""
+    dx, dy = to_x - from_x, to_y - from_y
+    length2 = dx * dx + dy * dy
+    t = 0.0 if length2 == 0 else max(0.0, min(1.0, ((cx - from_x) * dx + (cy - from_y) * dy) / length2))
+    return math.hypot(from_x + t * dx - cx, from_y + t * dy - cy) <= radius
+
+def finish_move(state, t):
+    """Rebond a la fraction t du trajet : la balle repart de sa position avec sa nouvelle vitesse."""
+    ball = state.ball
+    state.ball_from = (ball.x, ball.y)
+    remaining = (1 - t) * state.step_scale
+    ball.x += ball.speed_x * remaining
+    ball.y += ball.speed_y * remaining
 
 # async def handle_scoring_or_paddle_collision(game_id, paddle_left, paddle_right, ball):
 #     """
@@ -64,175 +106,161 @@ MIN_SPEED = 1.0
 
 #     return None
 
-async def handle_scoring_or_paddle_collision(game_id, paddle_left, paddle_right, ball):
-    """
-    Gère le fait qu'on marque un point ou qu'on ait juste un rebond sur la raquette.
-    Retourne 'score_left', 'score_right' ou None si on continue le jeu.
-    """
-    # 1) Vérifier si la balle est passée suffisamment pour être considérée comme un but
-    # Ici, on utilise le centre de la balle (ball.x) pour déterminer le score.
-    if ball.x + ball.size <= paddle_left.x + paddle_left.width and not (paddle_left.y <= ball.y <= paddle_left.y + paddle_left.height):
-        return 'score_right'
-    if ball.x - ball.size >= paddle_right.x - paddle_right.width and not (paddle_right.y <= ball.y <= paddle_right.y + paddle_right.height):
-        return 'score_left'
-    
-    # 2) Vérifier la collision avec la raquette gauche
-    # Ici, on détecte la collision dès que le bord gauche de la balle touche la raquette.
-    if ball.speed_x < 0 and (ball.x - ball.size) <= (paddle_left.x + paddle_left.width):
-        if paddle_left.y <= ball.y <= paddle_left.y + paddle_left.height:
-            # Si la balle touche la raquette, réaligner la balle sur le bord de la raquette
-            ball.x = paddle_left.x + paddle_left.width + ball.size
-            await process_paddle_collision(game_id, 'left', paddle_left, ball)
-            return None
-
-    # 3) Vérifier la collision avec la raquette droite
-    # Ici, on détecte la collision dès que le bord droit de la balle touche la raquette.
-    if ball.speed_x > 0 and (ball.x + ball.size) >= (paddle_right.x - paddle_right.width):
-        if paddle_right.y <= ball.y <= paddle_right.y + paddle_right.height:
-            # Réaligner la balle sur le bord de la raquette
-            ball.x = paddle_right.x - paddle_right.width - ball.size
-            await process_paddle_collision(game_id, 'right', paddle_right, ball)
-            return None
-
-    return None
-
-async def handle_scoring_or_paddle_collision(game_id, paddle_left, paddle_right, ball):
+async def handle_scoring_or_paddle_collision(state):
     """
     Gère le fait qu'on marque un point ou qu'on ait juste un rebond sur la raquette.
     (Prend en compte le "sticky".)
     Retourne 'score_left', 'score_right' ou None.
     """
+    ball = state.ball
+    paddle_left = state.paddle_left
+    paddle_right = state.paddle_right
 
     # 0) Si la balle est collée, on ignore la détection de but.
-    is_stuck = bool(get_key(game_id, "ball_stuck") or 0)
-    if is_stuck:
+    if state.ball_stuck:
         return None
 
-    # 1) Détection "balle passée à gauche => but pour la droite"
+    # 1) Collision raquette gauche : le centre de la balle franchit la ligne face + size
+    if ball.speed_x < 0 and (ball.x - ball.size) <= (paddle_left.x + paddle_left.width):
+        if await hit_paddle(state, 'left', paddle_left, paddle_left.x + paddle_left.width + ball.size):
+            return None
+
+    # 2) Collision raquette droite
+    if ball.speed_x > 0 and (ball.x + ball.size) >= (paddle_right.x - paddle_right.width):
+        if await hit_paddle(state, 'right', paddle_right, paddle_right.x - paddle_right.width - ball.size):
+            return None
+
+    # 3) Détection "balle passée à gauche => but pour la droite"
     if ball.x + ball.size <= paddle_left.x + paddle_left.width \
        and not (paddle_left.y <= ball.y <= paddle_left.y + paddle_left.height):
         return 'score_right'
 
-    # 2) Détection "balle passée à droite => but pour la gauche"
+    # 4) Détection "balle passée à droite => but pour la gauche"
     if ball.x - ball.size >= paddle_right.x - paddle_right.width \
        and not (paddle_right.y <= ball.y <= paddle_right.y + paddle_right.height):
         return 'score_left'
-    
-    # 3) Collision raquette gauche
-    if ball.speed_x < 0 and (ball.x - ball.size) <= (paddle_left.x + paddle_left.width):
-        if paddle_left.y <= ball.y <= paddle_left.y + paddle_left.height:
-            # On aligne la balle sur le bord
-            ball.x = paddle_left.x + paddle_left.width + ball.size
-            is_sticky = bool(get_key(game_id, "paddle_left_sticky") or 0)
-            if is_sticky : 
-                is_already_stuck = bool(get_key(game_id, "ball_stuck") or 0)
-                if not is_already_stuck:
-                    # On "colle" la balle
-                    stick_ball_to_paddle(game_id, 'left', paddle_left, ball)
-                    set_key(game_id, "paddle_left_already_stuck", 1)
-                return None
-            else:
-                ball.last_player = 'left'
-                await process_paddle_collision(game_id, 'left', paddle_left, ball)
-                return None
-
-    # 4) Collision raquette droite
-    if ball.speed_x > 0 and (ball.x + ball.size) >= (paddle_right.x - paddle_right.width):
-        if paddle_right.y <= ball.y <= paddle_right.y + paddle_right.height:
-            # On aligne la balle sur le bord
-            ball.x = paddle_right.x - paddle_right.width - ball.size
-            is_sticky = bool(get_key(game_id, "paddle_right_sticky") or 0)
-            if is_sticky:
-                is_already_stuck = bool(get_key(game_id, "ball_stuck") or 0)
-                if not is_already_stuck:
-                    # On "colle" la balle
-                    stick_ball_to_paddle(game_id, 'right', paddle_right, ball)
-                    set_key(game_id, "paddle_right_already_stuck", 1)
-                return None
-            else:
-                ball.last_player = 'right'
-                await process_paddle_collision(game_id, 'right', paddle_right, ball)
-                return None
 
     return None
 
+async def hit_paddle(state, side, paddle, line_x):
+    """
+    La balle touche-t-elle la raquette en franchissant line_x pendant le tick ?
+    Hauteur testée : celle du point de passage (pas celle de fin de tick). Une
+    balle déjà derrière la ligne au début du tick est testée a sa position.
+    """
+    ball = state.ball
+    from_x, from_y = state.ball_from
+    if (from_x - line_x) * (ball.x - line_x) < 0:
+        t = (from_x - line_x) / (from_x - ball.x)
+        hit_y = from_y + t * (ball.y - from_y)
+    else:
+        t, hit_y = 1.0, ball.y
+    if not (paddle.y <= hit_y <= paddle.y + paddle.height):
+        return False
+
+    # On aligne la balle sur le bord, au point d'impact
+    ball.x, ball.y = line_x, hit_y
+    if state.has_effect(side, 'sticky'):
+        # On "colle" la balle
+        stick_ball_to_paddle(state, side, paddle)
+        return True
+    ball.last_player = side
+    await process_paddle_collision(state, side, paddle)
+    finish_move(state, t)
+    return True
+
 
 #ball
-async def process_paddle_collision(game_id, paddle_side, current_paddle, ball):
+async def process_paddle_collision(state, paddle_side, current_paddle):
     """
     Gère la logique de collision entre la balle et une raquette.
-    Ajuste la vitesse et la direction de la balle, met à jour Redis et notifie les clients.
+    Ajuste la vitesse et la direction de la balle et notifie les clients.
     """
     print("process_paddle_collision")
+    ball = state.ball
 
     ball.last_player = paddle_side 
-    # speed = math.hypot(ball.speed_x, ball.speed_y) * 1.03  # Augmenter la vitesse
-    manage_ball_speed_and_angle(game_id, current_paddle, paddle_side, ball)
-
-
-
-
-    # Mettre à jour la balle dans Redis
-    update_ball_redis(game_id, ball)
+    manage_ball_speed_and_angle(state, current_paddle, paddle_side)
 
     # Notifier la collision via WebSocket
-    await notify_paddle_collision(game_id, paddle_side, ball)
+    notify_paddle_collision(state, paddle_side, ball)
     
 
-async def handle_border_collisions(game_id, ball):
+async def handle_border_collisions(state):
     """
     Gère les collisions avec les bords supérieur et inférieur.
     Ajuste la vitesse de la balle en conséquence.
     """
-    if ball.y - ball.size <= 50:
+    ball = state.ball
+    if ball.y - ball.size <= TERRAIN_TOP:
         border_side = "up"
+        reflect_on_border(state, TERRAIN_TOP + ball.size)
         ball.speed_y = abs(ball.speed_y)  # Rebond vers le bas
-        update_ball_redis(game_id, ball)
-        await notify_border_collision(game_id, border_side, ball)
+        notify_border_collision(state, border_side, ball)
 
-    elif ball.y + ball.size >= 350:
+    elif ball.y + ball.size >= TERRAIN_BOTTOM:
         border_side = "down"
+        reflect_on_border(state, TERRAIN_BOTTOM - ball.size)
         ball.speed_y = -abs(ball.speed_y)  # Rebond vers le haut
-        update_ball_redis(game_id, ball)
-        await notify_border_collision(game_id, border_side, ball)
+        notify_border_collision(state, border_side, ball)
 
+def reflect_on_border(state, line_y):
+    """La partie du trajet au-delà de line_y est renvoyée de l'autre côté (rebond exact)."""
+    ball = state.ball
+    from_x, from_y = state.ball_from
+    if (from_y - line_y) * (ball.y - line_y) < 0:
+        t = (from_y - line_y) / (from_y - ball.y)
+        state.ball_from = (from_x + t * (ball.x - from_x), line_y)
+    ball.y = 2 * line_y - ball.y
 
-async def handle_bumper_collision(game_id, ball, bumpers):
+
+async def handle_bumper_collision(state):
     """
     Gère les collisions entre la balle et les bumpers.
-    Ajuste la vitesse et la direction de la balle, met à jour Redis et notifie les clients.
+    Ajuste la vitesse et la direction de la balle et notifie les clients.
     """
-    current_time = time.time()
-    for bumper in bumpers:
+    ball = state.ball
+    from_x, from_y = state.ball_from
+    # Premier bumper rencontré sur le trajet, parmi ceux des cases traversées (broadphase.py)
+    first, first_t = None, None
+    for bumper in state.obstacle_grid.bumpers_along(state, from_x, from_y, ball.x, ball.y):
         if bumper.active:
-            dist = math.hypot(ball.x - bumper.x, ball.y - bumper.y)
-            if dist <= ball.size + bumper.size:
-                # if current_time - bumper.last_collision_time >= COOLDOWN_TIME:
-                angle = math.atan2(ball.y - bumper.y, ball.x - bumper.x)
-                speed = math.hypot(ball.speed_x, ball.speed_y)
-                ball.speed_x = speed * math.cos(angle)
-                ball.speed_y = speed * math.sin(angle)
-
-                # Mettre à jour la balle dans Redis
-                update_ball_redis(game_id, ball)
-
-                # IMPROVE (inutile ?) Mettre à jour le temps de la dernière collision
-                bumper.last_collision_time = current_time
-
-                # Notifier la collision via WebSocket
-                await notify_bumper_collision(game_id, bumper, ball)
+            t = segment_hit(from_x, from_y, ball.x, ball.y, bumper.x, bumper.y, ball.size + bumper.size)
+            if t is not None and (first_t is None or t < first_t):
+                first, first_t = bumper, t
+    if first is None:
+        return
+
+    # Rebond au point d'impact, dans la direction centre du bumper -> balle
+    ball.x = from_x + first_t * (ball.x - from_x)
+    ball.y = from_y + first_t * (ball.y - from_y)
+    angle = math.atan2(ball.y - first.y, ball.x - first.x)
+    speed = math.hypot(ball.speed_x, ball.speed_y)
+    ball.speed_x = speed * math.cos(angle)
+    ball.speed_y = speed * math.sin(angle)
+    finish_move(state, first_t)
+
+    # IMPROVE (inutile ?) Mettre à jour le temps de la dernière collision
+    first.last_collision_time = time.time()
+
+    # Notifier la collision via WebSocket
+    notify_bumper_collision(state, first, ball)
                     
 
-async def handle_powerup_collision(game_id, ball, powerup_orbs):
+async def handle_powerup_collision(state):
     """
     Vérifie si la balle a ramassé un power-up en dehors des collisions avec les paddles.
-    Applique l'effet du power-up au joueur concerné, met à jour Redis et notifie les clients.
+    Applique l'effet du power-up au joueur concerné et notifie les clients.
     """
-    for powerup_orb in powerup_orbs:
+    ball = state.ball
+    from_x, from_y = state.ball_from
+    # Seules les orbes des cases traversées (broadphase.py) ; une orbe ramassée reste
+    # dans la liste jusqu'a la reconstruction de la grille, d'où le test active
+    for powerup_orb in state.obstacle_grid.orbs_along(state, from_x, from_y, ball.x, ball.y):
         if powerup_orb.active:
-            dist = math.hypot(ball.x - powerup_orb.x, ball.y - powerup_orb.y)
-            if dist <= ball.size + powerup_orb.size:
+            if segment_touches(from_x, from_y, ball.x, ball.y,
+                               powerup_orb.x, powerup_orb.y, ball.size + powerup_orb.size):
                 # Associer le power-up au dernier joueur qui a touché la balle
                 last_player = ball.last_player
                 if last_player:
-                    await apply_powerup(game_id, last_player, powerup_orb)
+                    apply_powerup(state, last_player, powerup_orb)
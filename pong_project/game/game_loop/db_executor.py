@@ -0,0 +1,97 @@
+# game/game_loop/db_executor.py
+#
+# Pool de threads dédié aux accès ORM de la boucle de jeu.
+#
+# sync_to_async(thread_sensitive=True) (le défaut) fait passer TOUS les appels
+# base de données du processus (vues synchrones comprises) par un seul thread :
+# une requête lente en fin de partie (create_gameResults, tournoi...) retardait
+# toutes les autres parties. Ici les appels de la boucle de jeu passent par un
+# pool borné (settings.GAME_DB_THREADS threads, donc autant de connexions au
+# plus) et on mesure la file d'attente.
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+SLOW_WAIT_WARNING = 0.5  # secondes d'attente dans la file avant un avertissement
+
+class DBExecutor:
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="game-db")
+        self.lock = threading.Lock()
+        # Métriques
+        self.queued = 0         # appels en attente d'un thread
+        self.running = 0        # appels en cours
+        self.max_queued = 0
+        self.completed = 0
+        self.failed = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def wrap(self, func):
+        """Equivalent de sync_to_async(func), exécuté dans le pool dédié."""
+        async def wrapper(*args, **kwargs):
+            submitted = time.monotonic()
+            with self.lock:
+                self.queued += 1
+                self.max_queued = max(self.max_queued, self.queued)
+
+            def call():
+                wait = time.monotonic() - submitted
+                with self.lock:
+                    self.queued -= 1
+                    self.running += 1
+                    self.total_wait += wait
+                    self.max_wait = max(self.max_wait, wait)
+                if wait >= SLOW_WAIT_WARNING:
+                    print(f"[db_executor] {getattr(func, '__name__', func)} a attendu {wait * 1000:.0f}ms un thread "
+                          f"(file={self.queued}, threads={self.max_workers})")
+                try:
+                    # Connexions propres au thread : on écarte celles qui ont expiré
+                    close_old_connections()
+                    return func(*args, **kwargs)
+                except Exception:
+                    with self.lock:
+                        self.failed += 1
+                    raise
+                finally:
+                    with self.lock:
+                        self.running -= 1
+                        self.completed += 1
+
+            return await sync_to_async(call, thread_sensitive=False, executor=self.executor)()
+        return wrapper
+
+    def stats(self):
+        with self.lock:
+            return {
+                'threads': self.max_workers,
+                'queued': self.queued,
+                'running': self.running,
+                'max_queued': self.max_queued,
+                'completed': self.completed,
+                'failed': self.failed,
+                'avg_wait_ms': round(self.total_wait / self.completed * 1000, 2) if self.completed else 0,
+                'max_wait_ms': round(self.max_wait * 1000, 2),
+            }
+
+
+_DB_EXECUTOR = None
+
+def get_db_executor():
+    global _DB_EXECUTOR
+    if _DB_EXECUTOR is None:
+        _DB_EXECUTOR = DBExecutor(settings.GAME_DB_THREADS)
+    return _DB_EXECUTOR
+
+def db_executor_stats():
+    """stats() du pool, ou None s'il n'a pas encore servi dans ce processus."""
+    return _DB_EXECUTOR.stats() if _DB_EXECUTOR else None
+
+def db_sync_to_async(func):
+    """S'utilise comme sync_to_async : await db_sync_to_async(Model.objects.get)(pk=...)."""
+    return get_db_executor().wrap(func)
@@ -0,0 +1,142 @@
+# game/game_loop/engine.py
+
+import asyncio
+from django.conf import settings
+from channels.layers import get_channel_layer
+
+from .loop import step_game, TICK_RATE, MAX_CATCH_UP_STEPS
+from .status_utils import is_stopped, get_status
+from .scheduler import TickScheduler
+from .state_utils import save_state_snapshot, should_snapshot
+from .broadcast import broadcast_game_state, frame_due
+from .paddles_utils import read_paddles_inputs
+
+class BatchedEngine:
+    """
+    Moteur "groupé" : UN seul ticker par worker avance toutes les parties
+    enregistrées, puis envoie tous les broadcasts ensemble.
+
+    Chaque partie coûte une itération de boucle au lieu d'un réveil de tâche
+    asyncio (sleep + timer) par tick. Les coroutines game_loop restent
+    propriétaires du cycle de vie (attente des joueurs, fin de partie) et
+    attendent simplement que le moteur leur rende la main.
+    """
+    def __init__(self, tick_rate=TICK_RATE, max_catch_up=MAX_CATCH_UP_STEPS):
+        self.scheduler = TickScheduler(tick_rate, max_catch_up, name="batched engine")
+        self.games = {}  # { game_id: (state, parameters, future) }
+        self.task = None
+        self.physics = None
+        if settings.GAME_VECTORIZED_PHYSICS:
+            # Import tardif : NumPy n'est nécessaire qu'avec ce réglage
+            from .vectorized import VectorPhysics
+            self.physics = VectorPhysics()
+
+    def add_game(self, state, parameters):
+        """Enregistre une partie. Le future est résolu a True quand la partie est gagnée."""
+        future = asyncio.get_running_loop().create_future()
+        if self.physics is not None:
+            self.physics.add_game(state)
+        self.games[str(state.game_id)] = (state, parameters, future)
+        if self.task is None or self.task.done():
+            self.scheduler.reset()
+            self.task = asyncio.create_task(self.run())
+        return future
+
+    def remove_game(self, game_id):
+        entry = self.games.pop(str(game_id), None)
+        if entry and self.physics is not None:
+            self.physics.remove_game(game_id)
+        if entry and not entry[2].done():
+            entry[2].set_result(False)
+
+    async def run_game(self, state, parameters):
+        """
+        Fait tourner une partie dans le moteur jusqu'a sa fin.
+        Retourne True si la partie s'est terminée normalement, False si elle a été arrêtée
+        (statut sorti de 'running', vérifié en mémoire a chaque tick).
+        """
+        future = self.add_game(state, parameters)
+        try:
+            return await future
+        finally:
+            self.remove_game(state.game_id)
+
+    async def run(self):
+        channel_layer = get_channel_layer()
+        print("[engine] Batched engine started.")
+        while self.games:
+            steps = await self.scheduler.wait_next_tick()
+
+            # Entrées de toutes les parties (inbox de chaque partie)
+            try:
+                read_paddles_inputs([state for state, _, _ in self.games.values()])
+            except Exception as e:
+                print(f"[engine] Lecture des entrées impossible : {e}")
+
+            # Parties arrêtées (stop_game, changement de statut en base)
+            for game_id in [game_id for game_id in self.games if is_stopped(game_id)]:
+                print(f"[engine] game_id={game_id} => statut={get_status(game_id)}. Fin de la partie.")
+                self.remove_game(game_id)
+
+            for _ in range(steps):
+                entries = [(state, parameters) for state, parameters, _ in self.games.values()]
+                if not entries:
+                    break
+                try:
+                    if self.physics is not None:
+                        results = await self.physics.step(entries)
+                    else:
+                        results = await self.step_scalar(entries)
+                except Exception as e:
+                    # Seules les parties de ce pas sont terminées, le moteur continue
+                    results = {state.game_id: e for state, _ in entries}
+                for game_id, result in results.items():
+                    self.finish_game(game_id, result)
+
+            to_broadcast = []
+            for state, parameters, future in self.games.values():
+                if frame_due(state):
+                    to_broadcast.append(broadcast_game_state(state, channel_layer))
+                if should_snapshot(state):
+                    to_broadcast.append(save_state_snapshot(state))
+
+            # Tous les envois réseau du tick partent ensemble
+            if to_broadcast:
+                await asyncio.gather(*to_broadcast, return_exceptions=True)
+        print("[engine] Batched engine stopped (no more games).")
+
+    async def step_scalar(self, entries):
+        """Un tick de chaque partie avec step_game. Même format de retour que VectorPhysics.step."""
+        results = {}
+        for state, parameters in entries:
+            try:
+                if await step_game(state, parameters, read_inputs=False):
+                    results[state.game_id] = True
+            except Exception as e:
+                results[state.game_id] = e
+        return results
+
+    def finish_game(self, game_id, result):
+        """Retire une partie terminée (result=True) ou en erreur (result=exception)."""
+        entry = self.games.pop(str(game_id), None)
+        if entry is None:
+            return
+        state, _, future = entry
+        if self.physics is not None:
+            self.physics.remove_game(game_id)
+        if isinstance(result, Exception):
+            print(f"[engine] Exception pour game_id={game_id} : {result}")
+            if not future.done():
+                future.set_exception(result)
+        elif not future.done():
+            future.set_result(True)
+
+
+_ENGINE = None
+
+def get_engine():
+    """Retourne le moteur groupé du worker (créé au premier appel)."""
+    global _ENGINE
+    if _ENGINE is None:
+        _ENGINE = BatchedEngine()
+    return _ENGINE
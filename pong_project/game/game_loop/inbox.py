@@ -0,0 +1,107 @@
+# game/game_loop/inbox.py
+#
+# Entrées des joueurs (mouvements de raquette, demandes de keyframe), du
+# PongConsumer vers la boucle de jeu.
+#
+# Avant, le consumer écrivait paddle_<side>_velocity dans le hash Redis et la
+# boucle relisait ce hash a chaque tick. Maintenant chaque partie a une inbox
+# dans le processus qui la simule :
+#   - consumer du même processus : dépôt direct dans l'inbox (deliver_input) ;
+#   - consumer d'un autre processus : message 'game.input' sur le canal de
+#     l'inbox (nom publié dans le hash Redis de la partie, INBOX_CHANNEL_KEY),
+#     relayé dans l'inbox par une tâche de lecture.
+# La boucle vide l'inbox au début de chaque tick (paddles_utils.read_paddles_input).
+# Les entrées sont regroupées par tick : seul le dernier mouvement de chaque
+# joueur est appliqué (et au plus une demande de keyframe), quel que soit le
+# nombre de messages reçus entre deux ticks.
+# Chaque mouvement porte le numéro de séquence du client ; les frames renvoient
+# le dernier numéro appliqué par joueur (input_seq_left / input_seq_right).
+
+import asyncio
+from game.fanout import remote_changed
+from .redis_utils import set_key, get_key
+
+INBOX_CHANNEL_KEY = "inbox_channel"
+
+_INBOXES = {}  # { game_id: Inbox } des parties simulées par ce processus
+
+class Inbox:
+    def __init__(self, game_id):
+        self.game_id = str(game_id)
+        self.moves = {}  # { player: dernier message 'move' depuis le tick précédent }
+        self.keyframe_requested = False
+        self.channel = None
+        self.reader = None
+        # Compteurs
+        self.received = 0
+        self.coalesced = 0  # mouvements remplacés avant d'avoir été appliqués
+
+    async def open(self, channel_layer):
+        """Crée le canal des consumers distants et publie son nom."""
+        self.channel = await channel_layer.new_channel()
+        self.reader = asyncio.create_task(self.read_channel(channel_layer))
+        await set_key(self.game_id, INBOX_CHANNEL_KEY, self.channel)
+
+    async def read_channel(self, channel_layer):
+        while True:
+            message = await channel_layer.receive(self.channel)
+            # Consumer d'un autre processus (nouveau client : demande de keyframe)
+            if message.get('action') == 'request_keyframe':
+                remote_changed(self.game_id)
+            self.put(message)
+
+    def close(self):
+        if self.reader:
+            self.reader.cancel()
+
+    def put(self, message):
+        self.received += 1
+        if message.get('action') == 'request_keyframe':
+            self.keyframe_requested = True
+            return
+        if message.get('player') in self.moves:
+            self.coalesced += 1
+        self.moves[message.get('player')] = message
+
+    def drain(self):
+        """Entrées a appliquer depuis le dernier appel (au plus une par joueur + une keyframe)."""
+        messages = list(self.moves.values())
+        self.moves = {}
+        if self.keyframe_requested:
+            messages.append({'action': 'request_keyframe'})
+            self.keyframe_requested = False
+        return messages
+
+    def stats(self):
+        return {'game_id': self.game_id, 'received': self.received, 'coalesced': self.coalesced}
+
+async def open_inbox(game_id, channel_layer):
+    inbox = Inbox(game_id)
+    _INBOXES[inbox.game_id] = inbox
+    await inbox.open(channel_layer)
+    return inbox
+
+def close_inbox(game_id):
+    inbox = _INBOXES.pop(str(game_id), None)
+    if inbox:
+        inbox.close()
+
+def get_inbox(game_id):
+    return _INBOXES.get(str(game_id))
+
+def deliver_input(game_id, message):
+    """Dépose message dans l'inbox si la partie tourne dans ce processus. Retourne False sinon."""
+    inbox = get_inbox(game_id)
+    if inbox is None:
+        return False
+    inbox.put(message)
+    return True
+
+def inbox_stats():
+    """Compteurs des inbox des parties simulées par ce processus."""
+    return [inbox.stats() for inbox in _INBOXES.values()]
+
+async def remote_inbox_channel(game_id):
+    """Canal de l'inbox d'une partie simulée par un autre processus (None si elle n'a pas démarré)."""
+    channel = await get_key(game_id, INBOX_CHANNEL_KEY)
+    return channel.decode() if channel else None
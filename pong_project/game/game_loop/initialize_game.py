@@ -1,8 +1,12 @@
 # game/game_loop/initialize_game.py
 
-from .redis_utils import set_key
-from ..game_objects import Paddle, Ball, PowerUpOrb, Bumper
+from ..game_objects import Paddle, Ball, PowerUpOrb, Bumper, GameState
 from .dimensions_utils import get_terrain_rect
+from .spawn_schedule import SpawnSchedule
+from .spawn_points import SpawnPoints
+from .broadphase import ObstacleGrid
+from .powerups_utils import SPAWN_INTERVAL_POWERUPS
+from .bumpers_utils import SPAWN_INTERVAL_BUMPERS
 import random
 
 FIELD_HEIGHT = 300
@@ -78,41 +82,41 @@ def initialize_game_objects(game_id, parameters):
 
     # 5) Créer powerups & bumpers
     powerup_orbs = [
-        PowerUpOrb(game_id, 'invert', terrain_rect, color=(255, 105, 180)),
-        PowerUpOrb(game_id, 'shrink', terrain_rect, color=(255, 0, 0)),
-        PowerUpOrb(game_id, 'ice', terrain_rect, color=(0, 255, 255)),
-        PowerUpOrb(game_id, 'speed', terrain_rect, color=(255, 215, 0)),
-        PowerUpOrb(game_id, 'flash', terrain_rect, color=(255, 255, 0)),
-        PowerUpOrb(game_id, 'sticky', terrain_rect, color=(50, 205, 50))
+        PowerUpOrb(game_id, 'invert', color=(255, 105, 180)),
+        PowerUpOrb(game_id, 'shrink', color=(255, 0, 0)),
+        PowerUpOrb(game_id, 'ice', color=(0, 255, 255)),
+        PowerUpOrb(game_id, 'speed', color=(255, 215, 0)),
+        PowerUpOrb(game_id, 'flash', color=(255, 255, 0)),
+        PowerUpOrb(game_id, 'sticky', color=(50, 205, 50))
     ]
     bumpers = []
     if parameters.obstacles_enabled:
-        bumpers = [Bumper(game_id, terrain_rect) for _ in range(3)]
+        bumpers = [Bumper(game_id) for _ in range(3)]
 
     return paddle_left, paddle_right, ball, powerup_orbs, bumpers
 
-#------------- INITIALIZE : UPDATE REDIS DATABASE WITH OBJECTS VALUES--------------
-def initialize_redis(game_id, paddle_left, paddle_right, ball, parameters):
-    # Positions initiales des raquettes
-    set_key(game_id, "paddle_left_y", paddle_left.y)
-    set_key(game_id, "paddle_right_y", paddle_right.y)
+#------------- INITIALIZE : BUILD THE IN-MEMORY GAME STATE --------------
+def initialize_game_state(game_id, parameters):
+    paddle_left, paddle_right, ball, powerup_orbs, bumpers = initialize_game_objects(game_id, parameters)
 
-    # Vélocités initiales des raquettes (0 => immobiles)
-    set_key(game_id, "paddle_left_velocity", 0)
-    set_key(game_id, "paddle_right_velocity", 0)
-
-    # Store initial paddle heights from parameters / added
+    # Hauteur initiale des raquettes (appliquée dès le premier tick) / added
     initial_height = {1: 60, 2: 80, 3: 100}[parameters.paddle_size]
-    set_key(game_id, "initial_paddle_height", initial_height)
-    set_key(game_id, "paddle_left_height", initial_height)
-    set_key(game_id, "paddle_right_height", initial_height)
-
-    # Balle
-    set_key(game_id, "ball_x", ball.x)
-    set_key(game_id, "ball_y", ball.y)
-    set_key(game_id, "ball_vx", ball.speed_x)
-    set_key(game_id, "ball_vy", ball.speed_y)
+    paddle_left.height = initial_height
+    paddle_right.height = initial_height
 
-    # Store initial ball speed multiplier from parameters / added
+    # Vitesse initiale de la balle / added
     initial_speed = {1: 3, 2: 5, 3: 8}[parameters.ball_speed]
-    set_key(game_id, "initial_ball_speed_multiplier", initial_speed)
\ No newline at end of file
+
+    state = GameState(game_id, paddle_left, paddle_right, ball, powerup_orbs, bumpers,
+                      initial_height, initial_speed)
+
+    # Spawns de la partie (powerups / bumpers activés dans les paramètres)
+    intervals = {}
+    if parameters.bonus_enabled:
+        intervals['powerup'] = SPAWN_INTERVAL_POWERUPS
+    if parameters.obstacles_enabled:
+        intervals['bumper'] = SPAWN_INTERVAL_BUMPERS
+    state.spawns = SpawnSchedule(intervals)
+    state.spawn_points = SpawnPoints(get_terrain_rect(game_id))
+    state.obstacle_grid = ObstacleGrid()
+    return state
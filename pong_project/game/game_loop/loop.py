@@ -6,42 +6,65 @@ import time
 from django.conf import settings
 from channels.layers import get_channel_layer
 
-from .redis_utils import get_key
-from .models_utils import get_gameSession_status, get_gameSession, is_online_gameSession, get_gameSession_parameters, set_gameSession_status
-from .initialize_game import initialize_game_objects, initialize_redis
-from .paddles_utils import move_paddles
+from .models_utils import get_gameSession, get_gameSession_parameters, set_gameSession_status
+from .initialize_game import initialize_game_state
+from .state_utils import save_state_snapshot, load_state_snapshot, should_snapshot, mark_snapshot_dirty
+from .paddles_utils import read_paddles_input, move_paddles
 from .ball_utils import move_ball, move_ball_sticky, reset_ball
 from .collisions import (
     handle_scoring_or_paddle_collision,
-    # make_paddle_sticky,
     handle_border_collisions,
     handle_bumper_collision,
     handle_powerup_collision
 )
 from .score_utils import handle_score, winner_detected, finish_game, reset_all_objects
 from .bumpers_utils import handle_bumpers_spawn, handle_bumper_expiration
-from .powerups_utils import handle_powerups_spawn, handle_powerup_expiration
-from .broadcast import broadcast_game_state, notify_countdown, notify_scored
+from .powerups_utils import handle_powerups_spawn, handle_powerup_expiration, expire_effects
+from .broadcast import broadcast_game_state, notify_countdown, notify_scored, set_broadcast_rate, frame_due
+from .scheduler import TickScheduler
+from game.fanout import host_game, release_game
+from .inbox import open_inbox, close_inbox
+from game.stats import ensure_stats_publisher
+from .status_utils import (
+    track_status, untrack_status, ensure_status_listener, is_stopped, get_status,
+    ready_event, forget_ready_event
+)
+
+# Unité des vitesses (balle, raquettes) : px par tick a SPEED_TICK_RATE ticks/s
+SPEED_TICK_RATE = 90
+TICK_RATE = getattr(settings, 'GAME_TICK_RATE', SPEED_TICK_RATE)
+MAX_CATCH_UP_STEPS = 5
+POINT_PAUSE = 1.5  # secondes de pause après un but
 
 class WaitForPlayersTimeout(Exception):
     """Exception levée lorsqu'un délai d'attente est dépassé avant que les joueurs ne soient prêts."""
     pass
 
 async def wait_for_players(game_id):
+    """
+    Attend que ready_left et ready_right soient posés (au plus 30 s).
+    Les vues le signalent (signal_players_ready) : une seule lecture en base,
+    pour le cas où les joueurs étaient déjà prêts avant notre démarrage.
+    """
     print(f"[game_loop.py] wait_for_players {game_id}.")
     timeout = 30  # Durée maximale d'attente en secondes.
-    start_time = time.time()
-    
-    # Boucle d'attente pour vérifier si les joueurs sont prêts
-    while time.time() - start_time < timeout:
+
+    # L'event est créé AVANT la lecture en base : un signal arrivé entre les
+    # deux n'est pas perdu
+    event = ready_event(game_id)
+    try:
+        await ensure_status_listener()
         gs = await get_gameSession(game_id)
-        if gs.ready_left and gs.ready_right:
-            print(f"[game_loop.py] wait_for_players Everyone is READY {game_id}.")
-            return True
-        await asyncio.sleep(0.1)  # Petite pause pour éviter une boucle trop chargée
-    
-    # Si le timeout est dépassé, on lève une exception
-    raise WaitForPlayersTimeout(f"Délai d'attente de {timeout} secondes dépassé pour game_id {game_id}.")
+        if not (gs.ready_left and gs.ready_right):
+            await asyncio.wait_for(event.wait(), timeout)
+    except asyncio.TimeoutError:
+        # Si le timeout est dépassé, on lève une exception
+        raise WaitForPlayersTimeout(f"Délai d'attente de {timeout} secondes dépassé pour game_id {game_id}.")
+    finally:
+        forget_ready_event(game_id)
+
+    print(f"[game_loop.py] wait_for_players Everyone is READY {game_id}.")
+    return True
 
 
 async def countdown_before_game(game_id):
@@ -53,94 +76,180 @@ async def countdown_before_game(game_id):
 #     await notify_scored(game_id, scorer)
 #     await asyncio.sleep(1)
 
+async def step_game(state, parameters, read_inputs=True):
+    """
+    Avance la simulation d'UN tick (1/TICK_RATE s).
+    Retourne True si la partie est terminée (un joueur a atteint WIN_SCORE).
+    Ne fait jamais d'await bloquant : peut être appelée par le moteur groupé
+    (qui lit alors les entrées de toutes les parties d'un coup : read_inputs=False).
+    """
+    status = await begin_step(state)
+    if status is not None:
+        return status
+
+    # 2.1 - Mouvements
+    if read_inputs:
+        read_paddles_input(state)
+    move_objects(state)
+
+    # 2.2 / 2.3 - Collisions, paddles et score
+    scorer = await resolve_collisions(state)
+    await end_step(state, parameters, scorer)
+    return False
+
+async def begin_step(state):
+    """
+    Début de tick commun au moteur scalaire et au moteur vectorisé.
+    Retourne True (partie terminée), False (partie en pause) ou None (tick a simuler).
+    """
+    # Pause après un but : la partie est figée jusqu'a resume_time
+    if state.pending_scorer:
+        if time.monotonic() < state.resume_time:
+            return False
+        return resume_after_point(state)
+
+    state.tick += 1
+    expire_effects(state)
+    return None
+
+def move_objects(state):
+    move_paddles(state)
+
+    if state.ball_stuck:
+        move_ball_sticky(state)
+    else :
+        move_ball(state)
+
+async def resolve_collisions(state, border=True, bumpers=True, powerups=True, paddles=True):
+    """
+    Collisions dans l'ordre historique : bords, bumpers, powerups puis paddles/score.
+    Le moteur vectorisé désactive les tests dont il sait déjà qu'ils ne toucheront rien.
+    Retourne 'score_left', 'score_right' ou None.
+    """
+    if border:
+        await handle_border_collisions(state)
+    if bumpers:
+        await handle_bumper_collision(state)
+    if powerups:
+        await handle_powerup_collision(state)
+    if paddles:
+        return await handle_scoring_or_paddle_collision(state)
+    return None
+
+async def end_step(state, parameters, scorer):
+    """Fin de tick : point marqué, ou spawn/expiration des powerups et bumpers."""
+    if scorer in ['score_left', 'score_right']:
+        await handle_point(state, scorer)
+        return
+
+    # 2.4 - Powerups & Bumpers : rien a faire avant la prochaine échéance (spawn_schedule.py)
+    if state.tick < state.spawns.next_due:
+        return
+    if parameters.bonus_enabled:
+        await handle_powerups_spawn(state)
+        await handle_powerup_expiration(state)
+
+    if parameters.obstacles_enabled:
+        await handle_bumpers_spawn(state)
+        await handle_bumper_expiration(state)
+    state.spawns.update()
+
+async def handle_point(state, scorer):
+    """Un point est marqué : on vide le terrain et on met la partie en pause."""
+    await reset_all_objects(state)
+    notify_scored(state)
+    state.pending_scorer = scorer
+    state.resume_time = time.monotonic() + POINT_PAUSE
+
+def resume_after_point(state):
+    """
+    Fin de la pause : on compte le point puis on relance la balle.
+    Retourne True si on a un gagnant.
+    """
+    handle_score(state, state.pending_scorer)
+    state.pending_scorer = None
+
+    # Vérifier si on a un gagnant
+    if winner_detected(state):
+        return True
+
+    # Sinon reset de la balle
+    reset_ball(state)
+    # Score a jour dans Redis au prochain snapshot, après le tick
+    mark_snapshot_dirty(state)
+    return False
+
+async def run_game(state, parameters, channel_layer):
+    """
+    Boucle dédiée a une partie (mode par défaut).
+    Retourne True si la partie s'est terminée normalement, False si elle a été arrêtée.
+    """
+    game_id = state.game_id
+    # Cadence fixe (échéances absolues, rattrapage limité)
+    scheduler = TickScheduler(TICK_RATE, MAX_CATCH_UP_STEPS, name=f"game_id={game_id}")
+    while True:
+        steps = await scheduler.wait_next_tick()
+
+        # Vérifier si la partie est encore 'running' (statut en mémoire, cf. status_utils)
+        if is_stopped(game_id):
+            print(f"[game_loop] game_id={game_id} => statut={get_status(game_id)}. Fin de la boucle.")
+            return False
+
+        for _ in range(steps):
+            if await step_game(state, parameters):
+                return True
+
+        # Broadcast de l'état (une fois, même après un rattrapage), a la cadence d'envoi
+        # ou quand le tick a produit des événements
+        if frame_due(state):
+            await broadcast_game_state(state, channel_layer)
+
+        # Snapshot périodique dans Redis (reprise en cas d'arrêt)
+        if should_snapshot(state):
+            await save_state_snapshot(state)
+
 async def game_loop(game_id):
     """
-    Boucle principale pour UNE partie identifiée par game_id.
-    Tourne ~90 fois/s tant que la partie n'est pas 'finished'.
+    Cycle de vie d'UNE partie identifiée par game_id : attente des joueurs,
+    initialisation, simulation a TICK_RATE ticks/s puis fin de partie.
+    La simulation tourne soit dans sa propre boucle, soit dans le moteur groupé
+    du worker (settings.GAME_BATCHED_ENGINE).
     """
     channel_layer = get_channel_layer()
-    dt = 1/90
     print(f"[game_loop.py] Starting loop for game_id={game_id}.")
     try:
         await wait_for_players(game_id)
+        # A partir d'ici le statut est suivi en mémoire (signal post_save + pub/sub)
+        track_status(game_id)
+        # Les consumers de ce processus reçoivent les frames sans passer par Redis
+        await host_game(game_id, channel_layer)
+        # Entrées des joueurs : consumers locaux en direct, distants via le canal de l'inbox
+        await open_inbox(game_id, channel_layer)
+        ensure_stats_publisher()
         # Récupérer/charger les paramètres
         parameters = await get_gameSession_parameters(game_id)
 
 
-        # Construire les objets (raquettes, balle, powerups, bumpers)
-        paddle_left, paddle_right, ball, powerup_orbs, bumpers = initialize_game_objects(game_id, parameters)
-        initialize_redis(game_id, paddle_left, paddle_right, ball, parameters)
+        # Construire l'état en mémoire (raquettes, balle, powerups, bumpers)
+        # Il reste la source de vérité pendant toute la partie,
+        # Redis ne reçoit qu'un snapshot périodique.
+        state = initialize_game_state(game_id, parameters)
+        state.tick_rate = TICK_RATE
+        state.step_scale = SPEED_TICK_RATE / TICK_RATE
+        set_broadcast_rate(state, parameters.broadcast_rate or settings.GAME_BROADCAST_RATE, TICK_RATE)
+        if not await load_state_snapshot(state):
+            await save_state_snapshot(state)
         await countdown_before_game(game_id)
-        # print(f"[game_loop] Game objects initialisés pour game_id={game_id}")
-
-        
-        # await set_gameSession_status(game_id, "running")
-        
-        # 2) Lancer la boucle ~90fps 
-        while True:
-            
-            try :
-                # Vérifier si la partie est encore 'running' ou si on l'a terminée
-                session_status = await get_gameSession_status(game_id)
-                if session_status != 'running':
-                    print(f"[game_loop] game_id={game_id} => statut={session_status}. Fin de la boucle.")
-                    break
-
-                current_time = time.time()
-
-                # 2.1 - Mouvements
-                move_paddles(game_id, paddle_left, paddle_right)
-
-                #creer fonction is_sticky dans powerup utils ou ball utils
-                stuck_flag = get_key(game_id, "ball_stuck")
-                if stuck_flag and stuck_flag.decode('utf-8') == '1':
-                    move_ball_sticky(game_id, paddle_left, paddle_right, ball)
-                else :
-                    move_ball(game_id, ball)
-                # print(f"1")#debug
-                # 2.2 - Collisions
-                await handle_border_collisions(game_id, ball)
-                await handle_bumper_collision(game_id, ball, bumpers)
-                await handle_powerup_collision(game_id, ball, powerup_orbs)
-                # print(f"2")#debug
-
-                # 2.3 - Paddles / Score
-                scorer = await handle_scoring_or_paddle_collision(game_id, paddle_left, paddle_right, ball)
-                if scorer in ['score_left', 'score_right']:
-                    await reset_all_objects(game_id, powerup_orbs, bumpers) 
-                    await notify_scored(game_id)
-                    await asyncio.sleep(1.5)
-                    handle_score(game_id, scorer)
-
-                    # Vérifier si on a un gagnant
-                    if winner_detected(game_id):
-                        await finish_game(game_id)
-                        break
-                    else:
-                        # Sinon reset de la balle
-                        reset_ball(game_id, ball)
-
-                # print(f"3")#debug
-                # 2.4 - Powerups & Bumpers
-                if parameters.bonus_enabled:
-                    await handle_powerups_spawn(game_id, powerup_orbs, current_time, bumpers)
-                    await handle_powerup_expiration(game_id, powerup_orbs)
-
-                if parameters.obstacles_enabled:
-                    await handle_bumpers_spawn(game_id, bumpers, current_time, powerup_orbs)
-                    await handle_bumper_expiration(game_id, bumpers)
-                # print(f"4")#debug
-                # balle fixe apres un point
-                # launch_ball_after_score(game_id, ball)
-                # 2.5 - Broadcast de l'état
-                await broadcast_game_state(game_id, channel_layer, paddle_left, paddle_right, ball, powerup_orbs, bumpers)
-
-                # print(f"5")#debug
-                # 2.6 - Attendre ~16ms
-                await asyncio.sleep(dt)
-            except asyncio.CancelledError:
-                await set_gameSession_status(game_id, "cancelled")
-                return
+
+        # 2) Lancer la simulation
+        if getattr(settings, 'GAME_BATCHED_ENGINE', False):
+            from .engine import get_engine
+            game_over = await get_engine().run_game(state, parameters)
+        else:
+            game_over = await run_game(state, parameters, channel_layer)
+
+        if game_over:
+            await finish_game(state)
 
     except asyncio.CancelledError:
         print(f"[game_loop] => CANCELLED => on arrête la game {game_id}")
@@ -152,4 +261,7 @@ async def game_loop(game_id):
         print(f"[game_loop] Exception pour game_id={game_id} : {e}")
 
     finally:
+        untrack_status(game_id)
+        release_game(game_id)
+        close_inbox(game_id)
         print(f"[game_loop] Fin du game_loop pour game_id={game_id}.")
\ No newline at end of file
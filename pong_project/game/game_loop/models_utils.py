@@ -1,6 +1,6 @@
 # game/game_loop/models_utils.py
 from django.apps import apps  # Import retardé pour éviter les conflits d'import
-from asgiref.sync import sync_to_async
+from .db_executor import db_sync_to_async
 
 class GameSessionNotFound(Exception):
     """Exception personnalisée pour le cas où la session n'existe pas."""
@@ -14,7 +14,7 @@ async def get_gameSession(game_id):
     # print("get_gamesession")
     GameSession = apps.get_model('game', 'GameSession')
     try:
-        session = await sync_to_async(GameSession.objects.get)(pk=game_id)
+        session = await db_sync_to_async(GameSession.objects.get)(pk=game_id)
         return session
     except GameSession.DoesNotExist as e:
         raise GameSessionNotFound(f"La GameSession avec l'ID {game_id} n'existe pas.") from e
@@ -34,11 +34,11 @@ async def set_gameSession_status(game_id, status):
     GameSession = apps.get_model('game', 'GameSession')
     try:
         # Précharger player_left et player_right pour éviter des appels ORM en mode lazy
-        session = await sync_to_async(
+        session = await db_sync_to_async(
             GameSession.objects.select_related('player_left', 'player_right').get
         )(pk=game_id)
         session.status = status
-        await sync_to_async(session.save)()
+        await db_sync_to_async(session.save)()
         return session
     except GameSession.DoesNotExist as e:
         raise GameSessionNotFound(f"La GameSession avec l'ID {game_id} n'existe pas.") from e
@@ -46,8 +46,8 @@ async def set_gameSession_status(game_id, status):
 async def get_gameSession_parameters(game_id):
     GameSession = apps.get_model('game', 'GameSession')
     try:
-        session = await sync_to_async(GameSession.objects.get)(pk=game_id)
-        parameters = await sync_to_async(getattr)(session, 'parameters', None)
+        session = await db_sync_to_async(GameSession.objects.get)(pk=game_id)
+        parameters = await db_sync_to_async(getattr)(session, 'parameters', None)
     except parameters is None:
         raise GameParametersNotFound(f"La GameSession avec l'ID {game_id} n'a pas de paramètres définis.")
     return parameters
@@ -58,11 +58,11 @@ async def get_LocalTournament(game_id, phase):
     # print("get_LocalTournament")
     LocalTournament = apps.get_model('game', 'LocalTournament')
     if phase == "semifinal1":
-        tournament = await sync_to_async(LocalTournament.objects.filter(semifinal1__id=game_id).first)()
+        tournament = await db_sync_to_async(LocalTournament.objects.filter(semifinal1__id=game_id).first)()
     elif phase == "semifinal2":
-        tournament = await sync_to_async(LocalTournament.objects.filter(semifinal2__id=game_id).first)()
+        tournament = await db_sync_to_async(LocalTournament.objects.filter(semifinal2__id=game_id).first)()
     else:
-        tournament = await sync_to_async(LocalTournament.objects.filter(final__id=game_id).first)()
+        tournament = await db_sync_to_async(LocalTournament.objects.filter(final__id=game_id).first)()
     return tournament
 
 async def create_gameResults(game_id, gameSession_isOnline, endgame_infos):
@@ -73,7 +73,7 @@ async def create_gameResults(game_id, gameSession_isOnline, endgame_infos):
     try:
         print(f"[create_gameResults] Creating GameResult for game {game_id}...")
         # Récupérer la session de jeu en mode async
-        session = await sync_to_async(GameSession.objects.get)(pk=game_id)
+        session = await db_sync_to_async(GameSession.objects.get)(pk=game_id)
         if session.status == 'cancelled':
             print("[create_gameResults] => The game was cancelled => skipping result creation.")
             return
@@ -92,7 +92,7 @@ async def create_gameResults(game_id, gameSession_isOnline, endgame_infos):
             )
 
         # ✅ Exécuter la sauvegarde dans un thread synchrone sécurisé
-        await sync_to_async(save_game_result, thread_sensitive=True)()
+        await db_sync_to_async(save_game_result)()
 
     except GameSession.DoesNotExist:
         print(f"[create_gameResults] GameSession {game_id} does not exist.")
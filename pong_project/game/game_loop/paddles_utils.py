@@ -1,71 +1,62 @@
 # game/game_loop/paddles_utils.py
-from .redis_utils import get_key, set_key
-from .dimensions_utils import get_terrain_rect
+from .inbox import get_inbox
+from .wire import MAX_INPUT_SEQ
 # FIELD_HEIGHT = 400
 
 # -------------- PADDLES --------------------
-def move_paddles(game_id, paddle_left, paddle_right):
-    # 1) Lire les infos depuis Redis
-    left_vel = float(get_key(game_id, "paddle_left_velocity") or 0)
-    right_vel = float(get_key(game_id, "paddle_right_velocity") or 0)
-
-    # Get initial height for both paddles / added
-    initial_height = float(get_key(game_id, "initial_paddle_height"))
-
-    # Hauteurs
-    new_left_height = float(get_key(game_id, "paddle_left_height") or initial_height)
-    new_right_height = float(get_key(game_id, "paddle_right_height") or initial_height)
-
-    # Effets
-    is_left_inverted = bool(get_key(game_id, "paddle_left_inverted"))
-    is_right_inverted = bool(get_key(game_id, "paddle_right_inverted"))
-    is_left_on_ice = bool(get_key(game_id, "paddle_left_ice_effect"))
-    is_right_on_ice = bool(get_key(game_id, "paddle_right_ice_effect"))
-    has_left_speed_boost = bool(get_key(game_id, "paddle_left_speed_boost"))
-    has_right_speed_boost = bool(get_key(game_id, "paddle_right_speed_boost"))
-
-    # 2) Appliquer la hauteur
-    paddle_left.height = new_left_height
-    paddle_right.height = new_right_height
-
-    # 3) Calculer la direction effective
-    #    si invert => inverser le signe
-    if is_left_inverted:
-        left_vel = -left_vel
-    if is_right_inverted:
-        right_vel = -right_vel
-
-    #    si speed_boost => multiplier la vitesse
-    if has_left_speed_boost:
-        left_vel *= 1.5
-    if has_right_speed_boost:
-        right_vel *= 1.5
-
-    # 4) Déduire direction ou laisser en “velocity”
-    #    si on préfère la “direction” => -1,0,+1
-    #    ou rester en “velocity” direct
-    #    Dans le Paddle, on a la logique : if is_on_ice => friction etc.
-    direction_left = 0
-    if left_vel > 0: direction_left = 1
-    elif left_vel < 0: direction_left = -1
-
-    direction_right = 0
-    if right_vel > 0: direction_right = 1
-    elif right_vel < 0: direction_right = -1
-
-    # 5) Appeler la méthode move(...) de la classe Paddle
-    terrain_top = 50
-    terrain_bottom = 350
-
-    # On peut éventuellement passer “speed_boost” dans la signature.
-    # Ou, comme ci-dessous, vous appliquez la friction/glace directement dedans.
-    paddle_left.move(direction_left, is_left_on_ice, terrain_top, terrain_bottom, speed_boost=has_left_speed_boost)
-    paddle_right.move(direction_right, is_right_on_ice, terrain_top, terrain_bottom, speed_boost=has_right_speed_boost)
-
-    # 6) Sauvegarder la position finale dans Redis
-    set_key(game_id, "paddle_left_y", paddle_left.y)
-    set_key(game_id, "paddle_right_y", paddle_right.y)
-    # Ici, on peut aussi sauvegarder la velocity si on veut la persister.
+def read_paddles_input(state):
+    """Applique les entrées reçues par l'inbox de la partie depuis le tick précédent."""
+    inbox = get_inbox(state.game_id)
+    if inbox is None:
+        return
+    for message in inbox.drain():
+        apply_input(state, message)
+
+def apply_input(state, message):
+    action = message.get('action')
+    if action == 'move' and message.get('player') in state.velocity:
+        player = message['player']
+        state.velocity[player] = float(message['velocity'])
+        # Borné ici aussi : une entrée hors bornes ferait échouer pack_game_state et la partie
+        seq = min(max(int(message.get('seq', 0)), 0), MAX_INPUT_SEQ)
+        state.input_seq[player] = max(state.input_seq[player], seq)
+    elif action == 'request_keyframe':
+        state.keyframe_requested = True
+
+def read_paddles_inputs(states):
+    """Même lecture pour toutes les parties du moteur groupé."""
+    for state in states:
+        read_paddles_input(state)
+
+def move_paddles(state):
+    # 1) Appliquer les effets actifs a la velocity de chaque raquette
+    for side in ('left', 'right'):
+        paddle = state.get_paddle(side)
+        vel = state.velocity[side]
+
+        is_inverted = state.has_effect(side, 'inverted')
+        is_on_ice = state.has_effect(side, 'ice_effect')
+        has_speed_boost = state.has_effect(side, 'speed_boost')
+
+        # 2) Calculer la direction effective
+        #    si invert => inverser le signe
+        if is_inverted:
+            vel = -vel
+        #    si speed_boost => multiplier la vitesse
+        if has_speed_boost:
+            vel *= 1.5
+
+        # 3) Déduire direction -1,0,+1
+        #    Dans le Paddle, on a la logique : if is_on_ice => friction etc.
+        direction = 0
+        if vel > 0: direction = 1
+        elif vel < 0: direction = -1
+
+        # 4) Appeler la méthode move(...) de la classe Paddle
+        terrain_top = 50
+        terrain_bottom = 350
+        paddle.move(direction, is_on_ice, terrain_top, terrain_bottom,
+                    speed_boost=has_speed_boost, step_scale=state.step_scale)
 
 # -------------- PADDLES : UPDATE REDIS--------------------
 # def update_paddles_redis(game_id, paddle_left, paddle_right):
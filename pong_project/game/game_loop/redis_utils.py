@@ -1,21 +1,81 @@
 # game/game_loop/redis_utils.py
+#
+# Chaque partie est stockée dans UN hash Redis : game:<game_id> -> {champ: valeur}.
+# Les lectures/écritures groupées passent par HMGET / HSET en pipeline
+# (un seul aller-retour réseau), et la suppression d'une partie est un seul DEL.
+#
+# Le client est asynchrone (redis.asyncio) : une réponse lente de Redis ne bloque
+# plus l'event loop d'uvicorn (les autres parties et les WebSockets continuent).
+# Toutes les coroutines partagent le même pool de connexions.
 
-import redis
+import redis.asyncio as aioredis
+from redis.exceptions import WatchError
 from django.conf import settings
 
-r = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+pool = aioredis.ConnectionPool(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+r = aioredis.Redis(connection_pool=pool)
 
-def set_key(game_id, key, value):
-    r.set(f"{game_id}:{key}", value)
+# Un hash de partie abandonnée (ex: serveur arrêté) expire tout seul
+GAME_KEY_TTL = 3600
 
-def get_key(game_id, key):
-    return r.get(f"{game_id}:{key}")
+def game_key(game_id):
+    return f"game:{game_id}"
 
-def delete_key(game_id, key):
-    r.delete(f"{game_id}:{key}")
+async def set_key(game_id, key, value):
+    await r.hset(game_key(game_id), key, value)
 
-def scan_and_delete_keys(game_id):
-    keys = list(r.scan_iter(f"{game_id}:*"))
-    for key in keys:
-        r.delete(key)
+async def get_key(game_id, key):
+    return await r.hget(game_key(game_id), key)
 
+async def delete_key(game_id, key):
+    await r.hdel(game_key(game_id), key)
+
+async def incr_key(game_id, key, amount=1):
+    """Compteur partagé entre processus (HINCRBY) dans le hash de la partie."""
+    async with r.pipeline(transaction=False) as pipe:
+        pipe.hincrby(game_key(game_id), key, amount)
+        pipe.expire(game_key(game_id), GAME_KEY_TTL)
+        await pipe.execute()
+
+async def incr_existing(game_id, key, amount):
+    """
+    HINCRBY seulement si le hash de la partie existe encore, sans prolonger son TTL.
+    Après delete_game (partie terminée), un HINCRBY recréerait le hash pour GAME_KEY_TTL.
+    """
+    async with r.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(game_key(game_id))
+                if not await pipe.exists(game_key(game_id)):
+                    return
+                pipe.multi()
+                pipe.hincrby(game_key(game_id), key, amount)
+                await pipe.execute()
+                return
+            except WatchError:
+                # Hash modifié entre WATCH et EXEC (autre consumer, delete_game) : on recommence
+                continue
+
+async def get_many(game_id, keys):
+    """Lit plusieurs champs de la partie en un seul aller-retour (HMGET)."""
+    return await r.hmget(game_key(game_id), keys)
+
+async def set_many(game_id, mapping):
+    """
+    Écrit plusieurs champs de la partie en un seul aller-retour.
+    Les valeurs None sont supprimées du hash (HDEL) dans le même pipeline.
+    """
+    to_set = {key: value for key, value in mapping.items() if value is not None}
+    to_delete = [key for key, value in mapping.items() if value is None]
+
+    async with r.pipeline(transaction=False) as pipe:
+        if to_set:
+            pipe.hset(game_key(game_id), mapping=to_set)
+        if to_delete:
+            pipe.hdel(game_key(game_id), *to_delete)
+        pipe.expire(game_key(game_id), GAME_KEY_TTL)
+        await pipe.execute()
+
+async def delete_game(game_id):
+    """Supprime toutes les données Redis de la partie (un seul DEL)."""
+    await r.delete(game_key(game_id))
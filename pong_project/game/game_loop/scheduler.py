@@ -0,0 +1,87 @@
+# game/game_loop/scheduler.py
+
+import asyncio
+import time
+import weakref
+
+# Schedulers vivants de ce processus (statistiques internes, voir game/stats.py)
+_SCHEDULERS = weakref.WeakSet()
+
+class TickScheduler:
+    """
+    Cadence fixe de la simulation basée sur des échéances absolues (time.monotonic()).
+
+    Au lieu de faire "travail puis sleep(dt)" (la période réelle devient
+    dt + temps de calcul + jitter), on vise l'échéance suivante. Si la boucle a pris
+    du retard, wait_next_tick() retourne le nombre de ticks de simulation à rattraper,
+    limité à max_catch_up : au-delà, les ticks en trop sont abandonnés.
+    """
+    REPORT_INTERVAL = 5  # secondes entre deux rapports de dépassement
+
+    def __init__(self, tick_rate=90, max_catch_up=5, name=""):
+        self.tick_rate = tick_rate
+        self.period = 1 / tick_rate
+        self.max_catch_up = max_catch_up
+        self.name = name
+        self.next_deadline = None
+
+        # Statistiques de dépassement
+        self.last_overrun = 0.0
+        self.max_overrun = 0.0
+        self.late_ticks = 0
+        self.dropped_ticks = 0
+        self.last_report_time = 0.0
+        _SCHEDULERS.add(self)
+
+    def reset(self):
+        """Repart d'une échéance fraîche (ex: après une pause volontaire)."""
+        self.next_deadline = time.monotonic() + self.period
+
+    async def wait_next_tick(self):
+        """
+        Attend la prochaine échéance.
+        Retourne le nombre de ticks de simulation à exécuter (>= 1).
+        """
+        if self.next_deadline is None:
+            self.reset()
+
+        delay = self.next_deadline - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            # En retard : on laisse quand même la main aux autres coroutines
+            await asyncio.sleep(0)
+
+        now = time.monotonic()
+        overrun = max(0.0, now - self.next_deadline)
+        due = 1 + int(overrun // self.period)
+        steps = min(due, self.max_catch_up)
+
+        # On garde la phase : les échéances restent des multiples de la période
+        self.next_deadline += due * self.period
+        self._record_overrun(overrun, due, steps, now)
+        return steps
+
+    def _record_overrun(self, overrun, due, steps, now):
+        self.last_overrun = overrun
+        self.max_overrun = max(self.max_overrun, overrun)
+        if due > 1:
+            self.late_ticks += due - 1
+        if due > steps:
+            self.dropped_ticks += due - steps
+
+        if overrun > self.period and now - self.last_report_time >= self.REPORT_INTERVAL:
+            self.last_report_time = now
+            print(f"[scheduler] {self.name} tick overrun {overrun * 1000:.1f}ms "
+                  f"(max {self.max_overrun * 1000:.1f}ms, late={self.late_ticks}, dropped={self.dropped_ticks})")
+
+def scheduler_stats():
+    """Dépassements cumulés des boucles de jeu de ce processus (une par partie, ou le moteur groupé)."""
+    schedulers = list(_SCHEDULERS)
+    return {
+        'loops': len(schedulers),
+        'last_overrun_ms': round(max((s.last_overrun for s in schedulers), default=0.0) * 1000, 1),
+        'max_overrun_ms': round(max((s.max_overrun for s in schedulers), default=0.0) * 1000, 1),
+        'late_ticks': sum(s.late_ticks for s in schedulers),
+        'dropped_ticks': sum(s.dropped_ticks for s in schedulers),
+    }
@@ -1,76 +1,58 @@
 # game/game_loop/score_utils.py
 
 from channels.layers import get_channel_layer
-from asgiref.sync import sync_to_async
+from .db_executor import db_sync_to_async
 from .broadcast import notify_game_finished, notify_powerup_expired, notify_bumper_expired
-from .redis_utils import set_key, get_key, scan_and_delete_keys, delete_key
+from .redis_utils import delete_game
 from .models_utils import is_online_gameSession, set_gameSession_status, create_gameResults, get_LocalTournament
-
-from .powerups_utils import handle_powerups_spawn, delete_powerup_redis
-from .bumpers_utils import handle_bumpers_spawn, delete_bumper_redis
 # transformer en parametre ajustable GameParameters?
 WIN_SCORE = 6 
 
 
-async def reset_all_objects(game_id, powerup_orbs, bumpers): # / added
+async def reset_all_objects(state): # / added
     """Reset all active powerups and bumpers when a point is scored."""
     # Reset all powerups
-    for powerup in powerup_orbs:
+    for powerup in state.powerup_orbs:
         if powerup.active:
-            delete_powerup_redis(game_id, powerup)
             powerup.deactivate()
-            await notify_powerup_expired(game_id, powerup)
+            state.obstacles_changed()
+            notify_powerup_expired(state, powerup)
 
     # Reset all bumpers
-    for bumper in bumpers:
+    for bumper in state.bumpers:
         if bumper.active:
-            delete_bumper_redis(game_id, bumper)
             bumper.deactivate()
-            await notify_bumper_expired(game_id, bumper)
+            state.obstacles_changed()
+            notify_bumper_expired(state, bumper)
 
     # Reset any active effects
-    keys_to_delete = [
-        "paddle_left_sticky", "paddle_right_sticky",
-        "paddle_left_inverted", "paddle_right_inverted",
-        "paddle_left_ice_effect", "paddle_right_ice_effect",
-        "paddle_left_speed_boost", "paddle_right_speed_boost",
-        "flash_effect"
-    ]
-    for key in keys_to_delete:
-        delete_key(game_id, key)
+    state.clear_effects()
 
     # Reset paddle heights to initial values
-    initial_height = float(get_key(game_id, "initial_paddle_height"))
-    set_key(game_id, "paddle_left_height", initial_height)
-    set_key(game_id, "paddle_right_height", initial_height)
+    state.paddle_left.height = state.initial_paddle_height
+    state.paddle_right.height = state.initial_paddle_height
 
 
-def handle_score(game_id, scorer):
+def handle_score(state, scorer):
     if scorer == 'score_left':
-        score_left = int(get_key(game_id, "score_left") or 0) + 1
-        set_key(game_id, "score_left", score_left)
-        print(f"[loop.py] Player Left scored. Score: {score_left} - {get_key(game_id, 'score_right')}")            
+        state.score['left'] += 1
+        print(f"[loop.py] Player Left scored. Score: {state.score['left']} - {state.score['right']}")
 
     else :
-        score_right = int(get_key(game_id, "score_right") or 0) + 1
-        set_key(game_id, "score_right", score_right)
-        print(f"[loop.py] Player Right scored. Score: {get_key(game_id, 'score_left')} - {score_right}")
-
-
+        state.score['right'] += 1
+        print(f"[loop.py] Player Right scored. Score: {state.score['left']} - {state.score['right']}")
 
-def winner_detected(game_id):
 
-    score_left = int(get_key(game_id, "score_left") or 0)
-    score_right = int(get_key(game_id, "score_right") or 0)
 
-    if (score_left == WIN_SCORE or score_right == WIN_SCORE):
+def winner_detected(state):
+    if (state.score['left'] == WIN_SCORE or state.score['right'] == WIN_SCORE):
         return True
     return False
 
-async def finish_game(game_id):
-    # Récupérer les scores depuis Redis
-    score_left = int(get_key(game_id, "score_left") or 0)
-    score_right = int(get_key(game_id, "score_right") or 0)
+async def finish_game(state):
+    game_id = state.game_id
+    score_left = state.score['left']
+    score_right = state.score['right']
 
     # Marquer la session comme terminée et récupérer ses informations
     gameSession = await set_gameSession_status(game_id, "finished")
@@ -111,19 +93,19 @@ async def finish_game(game_id):
         print(f"[finish_game] this game was semifinal1 from tournament game_id={game_id}")
         tournament.status = 'semifinal1_done'
         tournament.winner_semifinal_1 = winner_local
-        await sync_to_async(tournament.save)()
+        await db_sync_to_async(tournament.save)()
     else:
         tournament = await get_LocalTournament(game_id, "semifinal2")
         if tournament:
             tournament.status = 'semifinal2_done'
             tournament.winner_semifinal_2 = winner_local
-            await sync_to_async(tournament.save)()
+            await db_sync_to_async(tournament.save)()
         else:
             tournament = await get_LocalTournament(game_id, "final")
             if tournament:
                 tournament.status = 'finished'
                 tournament.winner_final = winner_local
-                await sync_to_async(tournament.save)()
+                await db_sync_to_async(tournament.save)()
             else:
                 print(f"[finish_game] No tournament found for game_id={game_id}")
 
@@ -134,5 +116,5 @@ async def finish_game(game_id):
     else :
         await notify_game_finished(game_id, tournament_id, winner_local, looser_local)
 
-    scan_and_delete_keys(game_id)
-    print(f"[loop.py] Redis keys deleted for game_id={game_id}")
+    await delete_game(game_id)
+    print(f"[loop.py] Redis hash deleted for game_id={game_id}")
@@ -0,0 +1,125 @@
+# game/game_loop/spawn_points.py
+#
+# Choix de la position d'apparition des orbes et des bumpers.
+#
+# Avant, PowerUpOrb.spawn / Bumper.spawn tiraient jusqu'a 100 positions au
+# hasard, chacune comparée (math.hypot + print) a tous les objets du terrain.
+# Ici :
+#   - candidate_points : positions candidates de la zone de spawn, réparties
+#     en Poisson-disk (au moins CANDIDATE_SPACING entre deux candidates),
+#     calculées une fois par taille de terrain et par type d'objet ;
+#   - SpawnPoints (un par partie, state.spawn_points) : grille d'occupation
+#     des objets actifs (cases de SPAWN_DISTANCE), reconstruite quand
+#     state.obstacles_version change ; une candidate est libre si aucun objet
+#     des 9 cases voisines n'est a moins de SPAWN_DISTANCE.
+# Le terrain reste peu occupé (au plus 2 orbes et 3 bumpers) : quelques
+# tirages suffisent en moyenne. Après MAX_DRAWS tirages occupés, sample
+# renvoie None et le spawn est retenté plus tard (spawn_schedule.py).
+
+import math
+import random
+from functools import lru_cache
+
+SPAWN_DISTANCE = 40      # distance minimale entre deux objets sur le terrain
+CANDIDATE_SPACING = 10
+MAX_DRAWS = 16
+
+# Zone de spawn (fractions du terrain) et zone centrale exclue, par type d'objet
+SPAWN_AREA = {'left': 0.25, 'right': 0.75, 'top': 0.1, 'bottom': 0.9}
+POWERUP_CENTER_MARGIN = 50  # écart horizontal minimal au centre
+BUMPER_CENTER_RADIUS = 30   # distance minimale au centre
+
+def poisson_disk(left, top, width, height, spacing, rng, attempts=30):
+    """Points du rectangle, deux a deux distants d'au moins spacing (algorithme de Bridson)."""
+    cell = spacing / math.sqrt(2)
+    columns, rows = int(width / cell) + 1, int(height / cell) + 1
+    grid = [[None] * columns for _ in range(rows)]
+    points = []
+
+    def add(x, y):
+        points.append((x, y))
+        grid[int((y - top) / cell)][int((x - left) / cell)] = (x, y)
+        return len(points) - 1
+
+    def far_enough(x, y):
+        column, row = int((x - left) / cell), int((y - top) / cell)
+        for r in range(max(row - 2, 0), min(row + 3, rows)):
+            for c in range(max(column - 2, 0), min(column + 3, columns)):
+                other = grid[r][c]
+                if other and (other[0] - x) ** 2 + (other[1] - y) ** 2 < spacing ** 2:
+                    return False
+        return True
+
+    active = [add(left + rng.random() * width, top + rng.random() * height)]
+    while active:
+        index = rng.randrange(len(active))
+        px, py = points[active[index]]
+        for _ in range(attempts):
+            angle = rng.uniform(0, 2 * math.pi)
+            distance = rng.uniform(spacing, 2 * spacing)
+            x, y = px + distance * math.cos(angle), py + distance * math.sin(angle)
+            if left <= x < left + width and top <= y < top + height and far_enough(x, y):
+                active.append(add(x, y))
+                break
+        else:
+            active[index] = active[-1]
+            active.pop()
+    return points
+
+@lru_cache(maxsize=None)
+def spawn_area_points(left, top, width, height):
+    """Poisson-disk de la zone de spawn du terrain (graine fixe : même résultat dans tous les processus)."""
+    return poisson_disk(
+        left + width * SPAWN_AREA['left'],
+        top + height * SPAWN_AREA['top'],
+        width * (SPAWN_AREA['right'] - SPAWN_AREA['left']),
+        height * (SPAWN_AREA['bottom'] - SPAWN_AREA['top']),
+        CANDIDATE_SPACING, random.Random(0))
+
+@lru_cache(maxsize=None)
+def candidate_points(kind, left, top, width, height):
+    """Positions candidates pour kind ('powerup' ou 'bumper') sur ce terrain."""
+    points = spawn_area_points(left, top, width, height)
+    center_x, center_y = left + width / 2, top + height / 2
+    if kind == 'powerup':
+        return tuple(p for p in points if abs(p[0] - center_x) >= POWERUP_CENTER_MARGIN)
+    return tuple(p for p in points if math.hypot(p[0] - center_x, p[1] - center_y) >= BUMPER_CENTER_RADIUS)
+
+class SpawnPoints:
+    def __init__(self, terrain_rect):
+        self.terrain = (terrain_rect['left'], terrain_rect['top'], terrain_rect['width'], terrain_rect['height'])
+        self.grid = {}  # { (colonne, ligne): [(x, y), ...] } des objets actifs
+        self.version = None
+        # Calcul des candidates (une fois par taille de terrain) a la création de la partie, pas dans un tick
+        for kind in ('powerup', 'bumper'):
+            candidate_points(kind, *self.terrain)
+
+    def sync(self, state):
+        """Reconstruit la grille si des objets sont apparus ou ont disparu depuis."""
+        if self.version == state.obstacles_version:
+            return
+        self.grid = {}
+        for obj in (*state.powerup_orbs, *state.bumpers):
+            if obj.active:
+                cell = (int(obj.x // SPAWN_DISTANCE), int(obj.y // SPAWN_DISTANCE))
+                self.grid.setdefault(cell, []).append((obj.x, obj.y))
+        self.version = state.obstacles_version
+
+    def is_free(self, x, y):
+        column, row = int(x // SPAWN_DISTANCE), int(y // SPAWN_DISTANCE)
+        for c in (column - 1, column, column + 1):
+            for r in (row - 1, row, row + 1):
+                for ox, oy in self.grid.get((c, r), ()):
+                    if (ox - x) ** 2 + (oy - y) ** 2 < SPAWN_DISTANCE ** 2:
+                        return False
+        return True
+
+    def sample(self, state, kind):
+        """Position libre pour un nouvel objet kind, ou None si le terrain est trop occupé."""
+        self.sync(state)
+        candidates = candidate_points(kind, *self.terrain)
+        for _ in range(MAX_DRAWS):
+            x, y = random.choice(candidates)
+            if self.is_free(x, y):
+                return x, y
+        return None
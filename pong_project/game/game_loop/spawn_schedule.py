@@ -0,0 +1,54 @@
+# game/game_loop/spawn_schedule.py
+#
+# Calendrier des apparitions et disparitions d'orbes et de bumpers, un par
+# partie (state.spawns, créé par initialize_game_state).
+#
+# Avant, handle_powerups_spawn / handle_bumpers_spawn gardaient l'heure du
+# dernier spawn en attribut de la fonction : une seule horloge pour toutes les
+# parties du processus, les spawns tombaient dans la première partie qui
+# tickait et les autres attendaient. Ici chaque partie a ses échéances, en ticks :
+#   - next_spawn : prochain essai de spawn par type d'objet ;
+#   - expiries   : disparition de chaque objet présent sur le terrain ;
+#   - next_due   : la plus proche des deux, seule valeur comparée a chaque tick
+#                  (end_step) ; math.inf si rien n'est prévu.
+# Un essai de spawn qui échoue (maximum atteint, orbes en cooldown, pas de
+# place) est retenté SPAWN_RETRY secondes plus tard.
+
+import math
+
+SPAWN_RETRY = 0.25
+
+def to_ticks(state, seconds):
+    return max(1, round(seconds * state.tick_rate))
+
+class SpawnSchedule:
+    def __init__(self, intervals):
+        # { 'powerup' | 'bumper': secondes entre deux spawns } des objets activés pour la partie
+        self.intervals = intervals
+        self.next_spawn = {}
+        self.expiries = {}  # { objet: tick de disparition }
+        self.next_due = 0 if intervals else math.inf
+
+    def spawn_due(self, state, kind):
+        # Premier appel : le premier spawn a lieu un intervalle après le début de la partie
+        if kind not in self.next_spawn:
+            self.next_spawn[kind] = state.tick + to_ticks(state, self.intervals[kind])
+            return False
+        return self.next_spawn[kind] <= state.tick
+
+    def spawned(self, state, kind, obj):
+        self.next_spawn[kind] = state.tick + to_ticks(state, self.intervals[kind])
+        self.expiries[obj] = state.tick + to_ticks(state, obj.duration)
+
+    def retry(self, state, kind):
+        self.next_spawn[kind] = state.tick + to_ticks(state, SPAWN_RETRY)
+
+    def pop_expired(self, state, objects):
+        """Objets de objects dont la durée de vie est écoulée (actifs ou non)."""
+        expired = [obj for obj in objects if self.expiries.get(obj, math.inf) <= state.tick]
+        for obj in expired:
+            del self.expiries[obj]
+        return expired
+
+    def update(self):
+        self.next_due = min([*self.next_spawn.values(), *self.expiries.values()], default=math.inf)
@@ -0,0 +1,98 @@
+# game/game_loop/state_utils.py
+
+import json
+from .redis_utils import get_many, set_many
+from . import timers
+
+# Un snapshot toutes les 45 ticks (~0.5s a 90 fps)
+SNAPSHOT_INTERVAL = 45
+
+EFFECTS = ('inverted', 'ice_effect', 'speed_boost', 'sticky')
+
+# -------------- SNAPSHOT : GAME STATE -> REDIS --------------------
+def state_to_snapshot(state):
+    """
+    Convertit le GameState en dictionnaire {clé redis: valeur}.
+    Les booléens sont stockés en 0/1.
+    """
+    ball = state.ball
+    snapshot = {
+        "tick": state.tick,
+        "ball_x": ball.x,
+        "ball_y": ball.y,
+        "ball_vx": ball.speed_x,
+        "ball_vy": ball.speed_y,
+        "paddle_left_y": state.paddle_left.y,
+        "paddle_right_y": state.paddle_right.y,
+        "paddle_left_height": state.paddle_left.height,
+        "paddle_right_height": state.paddle_right.height,
+        "initial_paddle_height": state.initial_paddle_height,
+        "initial_ball_speed_multiplier": state.initial_ball_speed,
+        "score_left": state.score['left'],
+        "score_right": state.score['right'],
+        "flash_effect": int(state.flash_effect),
+        "ball_stuck": int(state.ball_stuck),
+        # Balle collée : côté, position sur la raquette et vitesse a rendre au relâchement
+        # (None => champ supprimé du hash, voir set_many)
+        "stuck_side": state.stuck_side,
+        "sticky_relative_pos": state.sticky_relative_pos,
+        "ball_original_speed": json.dumps(state.ball_original_speed) if state.ball_original_speed else None,
+        # Echéances des effets en cours (tick absolu), pour qu'ils se terminent après reprise
+        "effect_timers": json.dumps(state.timer_deadlines),
+    }
+    for side in ('left', 'right'):
+        for effect in EFFECTS:
+            snapshot[f"paddle_{side}_{effect}"] = int(state.has_effect(side, effect))
+    return snapshot
+
+async def save_state_snapshot(state):
+    state.last_snapshot_tick = state.tick
+    await set_many(state.game_id, state_to_snapshot(state))
+
+def should_snapshot(state):
+    return state.tick - state.last_snapshot_tick >= SNAPSHOT_INTERVAL
+
+def mark_snapshot_dirty(state):
+    """Snapshot a la fin du tick (should_snapshot), sans attendre Redis pendant le tick."""
+    state.last_snapshot_tick = state.tick - SNAPSHOT_INTERVAL
+
+# -------------- RECOVERY : REDIS -> GAME STATE --------------------
+async def load_state_snapshot(state):
+    """
+    Recharge le dernier snapshot (partie interrompue) dans le GameState.
+    Retourne False si aucun snapshot n'existe pour cette partie.
+    """
+    keys = list(state_to_snapshot(state).keys())
+    values = dict(zip(keys, await get_many(state.game_id, keys)))
+    if values["tick"] is None:
+        return False
+
+    state.tick = int(values["tick"])
+    state.last_snapshot_tick = state.tick
+    state.ball.x = float(values["ball_x"])
+    state.ball.y = float(values["ball_y"])
+    state.ball.speed_x = float(values["ball_vx"])
+    state.ball.speed_y = float(values["ball_vy"])
+    state.paddle_left.y = float(values["paddle_left_y"])
+    state.paddle_right.y = float(values["paddle_right_y"])
+    state.paddle_left.height = float(values["paddle_left_height"])
+    state.paddle_right.height = float(values["paddle_right_height"])
+    state.score['left'] = int(values["score_left"])
+    state.score['right'] = int(values["score_right"])
+    state.flash_effect = values["flash_effect"] == b'1'
+    for side in ('left', 'right'):
+        for effect in EFFECTS:
+            if values[f"paddle_{side}_{effect}"] == b'1':
+                state.effects[side].add(effect)
+    if values["effect_timers"] is not None:
+        timers.restore(state, json.loads(values["effect_timers"]))
+    # Balle collée : son échéance 'sticky_release' fait partie de effect_timers
+    stuck_side = values["stuck_side"].decode() if values["stuck_side"] is not None else None
+    if values["ball_stuck"] == b'1' and f'sticky_release:{stuck_side}' in state.timer_deadlines:
+        state.ball_stuck = True
+        state.stuck_side = stuck_side
+        state.sticky_relative_pos = float(values["sticky_relative_pos"] or 0)
+        if values["ball_original_speed"] is not None:
+            state.ball_original_speed = tuple(json.loads(values["ball_original_speed"]))
+    print(f"[state_utils.py] game_id={state.game_id} restored from snapshot at tick {state.tick}")
+    return True
@@ -0,0 +1,117 @@
+# game/game_loop/status_utils.py
+#
+# Statut des parties en cours, tenu en mémoire dans chaque processus.
+# La boucle de jeu le consulte a chaque tick (lecture d'un dict) au lieu
+# d'interroger Postgres : la base n'est lue que quand le statut change.
+#
+# Mises a jour :
+#   - stop_game (tasks.py) : 'cancelled' dans le processus courant ;
+#   - signal post_save de GameSession (game/signals.py) : dans le processus
+#     qui enregistre, puis publié sur Redis (pub/sub) pour les autres
+#     processus (uvicorn <-> game workers).
+#
+# Même canal pour "les deux joueurs sont prêts" (PLAYERS_READY) : les vues
+# qui posent ready_left / ready_right réveillent wait_for_players sans
+# qu'il ait besoin d'interroger la base.
+
+import asyncio
+import redis
+from django.conf import settings
+from .redis_utils import r
+
+STATUS_CHANNEL = "game_status"
+PLAYERS_READY = "players_ready"
+
+# Client synchrone : on publie depuis les vues et les signaux (threads)
+sync_r = redis.Redis(host=settings.REDIS_HOST, port=settings.REDIS_PORT, db=0)
+
+_STATUSES = {}      # { game_id: status } des parties suivies par ce processus
+_READY_EVENTS = {}  # { game_id: (loop, asyncio.Event) } des parties qui attendent leurs joueurs
+_LISTENER = None
+_SUBSCRIBED = None  # asyncio.Event levé une fois l'abonnement pub/sub en place
+
+def track_status(game_id, status='running'):
+    """La partie tourne dans ce processus : on suit désormais son statut."""
+    _STATUSES[str(game_id)] = status
+
+def untrack_status(game_id):
+    _STATUSES.pop(str(game_id), None)
+
+def set_status(game_id, status):
+    """Met a jour le statut d'une partie suivie (ignorée sinon)."""
+    if str(game_id) in _STATUSES:
+        _STATUSES[str(game_id)] = status
+
+def get_status(game_id):
+    return _STATUSES.get(str(game_id))
+
+def is_stopped(game_id):
+    """True si la partie a quitté l'état 'running' (cancelled, finished...)."""
+    status = _STATUSES.get(str(game_id))
+    return status is not None and status != 'running'
+
+def encode_status(game_id, status):
+    return f"{game_id}:{status}"
+
+def publish(game_id, message):
+    """Diffuse un statut (ou PLAYERS_READY) a tous les processus. Appelable depuis un thread."""
+    try:
+        sync_r.publish(STATUS_CHANNEL, encode_status(game_id, message))
+    except redis.RedisError as e:
+        print(f"[status_utils] Publication impossible pour game_id={game_id} : {e}")
+
+# ------------------------- Joueurs prêts -------------------------
+def ready_event(game_id):
+    """Event levé quand les deux joueurs de game_id sont prêts (a créer dans la boucle de la partie)."""
+    event = asyncio.Event()
+    _READY_EVENTS[str(game_id)] = (asyncio.get_running_loop(), event)
+    return event
+
+def forget_ready_event(game_id):
+    _READY_EVENTS.pop(str(game_id), None)
+
+def mark_players_ready(game_id):
+    """Réveille wait_for_players si la partie attend dans ce processus. Appelable depuis un thread."""
+    entry = _READY_EVENTS.get(str(game_id))
+    if entry:
+        loop, event = entry
+        loop.call_soon_threadsafe(event.set)
+
+def signal_players_ready(game_id):
+    """Appelée par les vues quand ready_left et ready_right sont posés."""
+    mark_players_ready(game_id)
+    publish(game_id, PLAYERS_READY)
+
+async def listen_status_changes():
+    """Relaie dans ce processus les changements de statut publiés par les autres."""
+    while True:
+        try:
+            pubsub = r.pubsub(ignore_subscribe_messages=True)
+            await pubsub.subscribe(STATUS_CHANNEL)
+            _SUBSCRIBED.set()
+            async for message in pubsub.listen():
+                game_id, _, status = message['data'].decode().partition(':')
+                if status == PLAYERS_READY:
+                    mark_players_ready(game_id)
+                else:
+                    set_status(game_id, status)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _SUBSCRIBED.clear()
+            print(f"[status_utils] Abonnement {STATUS_CHANNEL} perdu : {e}. Reconnexion dans 1s.")
+            await asyncio.sleep(1)
+
+async def ensure_status_listener(timeout=1):
+    """
+    Démarre (une fois par processus) l'écoute des changements de statut et des
+    joueurs prêts, et attend que l'abonnement soit en place (au plus timeout s).
+    """
+    global _LISTENER, _SUBSCRIBED
+    if _LISTENER is None or _LISTENER.done():
+        _SUBSCRIBED = asyncio.Event()
+        _LISTENER = asyncio.create_task(listen_status_changes())
+    try:
+        await asyncio.wait_for(_SUBSCRIBED.wait(), timeout)
+    except asyncio.TimeoutError:
+        print(f"[status_utils] Abonnement {STATUS_CHANNEL} pas encore en place.")
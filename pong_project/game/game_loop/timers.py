@@ -0,0 +1,45 @@
+# game/game_loop/timers.py
+#
+# Échéances en ticks de simulation, par partie : tas (heapq) de
+# (tick d'échéance, clé) dans state.timers, avancé par la boucle au début de
+# chaque tick. Remplace les tâches asyncio qui dormaient pendant la durée
+# d'un effet : l'expiration a lieu dans le tick, de façon déterministe, et
+# coûte une comparaison par tick plus O(log n) par échéance atteinte.
+#
+# state.timer_deadlines garde la dernière échéance de chaque clé : reprogrammer
+# une clé (ex: même powerup ramassé deux fois) rend l'ancienne entrée du tas
+# caduque, elle est ignorée quand elle sort.
+
+import heapq
+
+def schedule(state, key, seconds):
+    """(Re)programme key dans seconds secondes. Retourne le tick d'échéance."""
+    deadline = state.tick + max(1, round(seconds * state.tick_rate))
+    state.timer_deadlines[key] = deadline
+    heapq.heappush(state.timers, (deadline, key))
+    return deadline
+
+def restore(state, deadlines):
+    """Reprogramme des échéances absolues (rechargement d'un snapshot)."""
+    clear(state)
+    for key, deadline in deadlines.items():
+        state.timer_deadlines[key] = deadline
+        heapq.heappush(state.timers, (deadline, key))
+
+def due(state):
+    return bool(state.timers) and state.timers[0][0] <= state.tick
+
+def pop_expired(state):
+    """Clés dont l'échéance est atteinte a ce tick."""
+    expired = []
+    timers = state.timers
+    while timers and timers[0][0] <= state.tick:
+        deadline, key = heapq.heappop(timers)
+        if state.timer_deadlines.get(key) == deadline:
+            del state.timer_deadlines[key]
+            expired.append(key)
+    return expired
+
+def clear(state):
+    state.timers.clear()
+    state.timer_deadlines.clear()
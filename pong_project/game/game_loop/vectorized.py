@@ -0,0 +1,341 @@
+# game/game_loop/vectorized.py
+#
+# Physique "struct-of-arrays" pour le moteur groupé (engine.py).
+#
+# La balle et les raquettes de TOUTES les parties du worker vivent dans des
+# tableaux NumPy contigus (une ligne par partie). A chaque tick :
+#   - déplacement des balles et détection bords / bumpers / orbes / paddles / buts
+#     pour toutes les parties en quelques opérations sur tableaux ;
+#   - seules les parties où quelque chose est touché repassent par le code
+#     scalaire habituel (collisions.py), qui résout l'événement exactement
+#     comme avant (rebond, powerup, sticky, notifications...).
+#
+# La détection vectorisée est un sur-ensemble de la détection scalaire
+# (mêmes comparaisons, sur le trajet de la balle pendant le tick pour les
+# bumpers et les orbes, marge infime sur les distances) : une partie non
+# signalée n'aurait rien touché dans le chemin scalaire, une partie signalée
+# est traitée par le code scalaire lui-même. Les résultats sont donc identiques
+# (vérifié tick par tick par game/tests.py : VectorPhysicsEquivalenceTest).
+
+import numpy as np
+
+from ..game_objects import Ball, Paddle
+from .loop import begin_step, end_step, resolve_collisions
+from .powerups_utils import expire_effects
+from .paddles_utils import move_paddles
+from .ball_utils import move_ball_sticky
+# Mêmes bornes que la détection scalaire
+from .collisions import TERRAIN_TOP, TERRAIN_BOTTOM
+
+# cf. initialize_game_objects : 6 orbes et au plus 3 bumpers par partie
+ORB_SLOTS = 6
+BUMPER_SLOTS = 3
+
+INITIAL_CAPACITY = 64
+# Marge relative sur les tests de distance (math.hypot vs dx² + dy²)
+DETECTION_SLACK = 1e-9
+
+
+class _Column:
+    """Attribut d'objet de jeu stocké dans un tableau du moteur vectorisé."""
+    def __init__(self, array_name):
+        self.array_name = array_name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        return float(getattr(obj._physics, self.array_name)[obj._index])
+
+    def __set__(self, obj, value):
+        getattr(obj._physics, self.array_name)[obj._index] = value
+
+
+class ArrayBall(Ball):
+    """Ball dont la position et la vitesse sont lues/écrites dans les tableaux."""
+    x = _Column('ball_x')
+    y = _Column('ball_y')
+    speed_x = _Column('ball_vx')
+    speed_y = _Column('ball_vy')
+    size = _Column('ball_size')
+
+    def __init__(self, physics, slot, ball):
+        self._physics = physics
+        self._index = slot
+        super().__init__(ball.x, ball.y, ball.speed_x, ball.speed_y, ball.size)
+        self.last_player = ball.last_player
+
+    def detach(self):
+        ball = Ball(self.x, self.y, self.speed_x, self.speed_y, self.size)
+        ball.last_player = self.last_player
+        return ball
+
+
+class ArrayPaddle(Paddle):
+    """Paddle dont la position et la taille sont lues/écrites dans les tableaux."""
+    x = _Column('paddle_x')
+    y = _Column('paddle_y')
+    width = _Column('paddle_w')
+    height = _Column('paddle_h')
+    speed = _Column('paddle_speed')
+    velocity = _Column('paddle_v')
+
+    def __init__(self, physics, slot, column, paddle):
+        self._physics = physics
+        self._index = (slot, column)
+        self.position = paddle.position
+        self.x = paddle.x
+        self.y = paddle.y
+        self.width = paddle.width
+        self.height = paddle.height
+        self.speed = paddle.speed
+        self.velocity = paddle.velocity
+
+    def detach(self):
+        paddle = Paddle(self.position, self.height, self.speed)
+        paddle.x, paddle.y, paddle.width = self.x, self.y, self.width
+        paddle.velocity = self.velocity
+        return paddle
+
+
+class VectorPhysics:
+    """
+    Tableaux de physique des parties du moteur groupé.
+    Une partie occupe un "slot" (une ligne) de son ajout a son retrait.
+    """
+    def __init__(self, capacity=INITIAL_CAPACITY):
+        self.capacity = 0
+        self.slots = {}               # { game_id: slot }
+        self.states = []              # slot -> GameState (ou None)
+        self.obstacles_versions = []  # slot -> state.obstacles_version chargée
+        self.free_slots = []
+        self._grow(capacity)
+
+    def _columns(self, capacity):
+        return (
+            ('ball_x', (capacity,), float), ('ball_y', (capacity,), float),
+            ('ball_vx', (capacity,), float), ('ball_vy', (capacity,), float),
+            ('ball_size', (capacity,), float),
+            ('ball_from_x', (capacity,), float), ('ball_from_y', (capacity,), float),
+            ('step_scale', (capacity,), float),
+            ('paddle_x', (capacity, 2), float), ('paddle_y', (capacity, 2), float),
+            ('paddle_w', (capacity, 2), float), ('paddle_h', (capacity, 2), float),
+            ('paddle_speed', (capacity, 2), float), ('paddle_v', (capacity, 2), float),
+            ('bumper_x', (capacity, BUMPER_SLOTS), float), ('bumper_y', (capacity, BUMPER_SLOTS), float),
+            ('bumper_r', (capacity, BUMPER_SLOTS), float), ('bumper_active', (capacity, BUMPER_SLOTS), bool),
+            ('orb_x', (capacity, ORB_SLOTS), float), ('orb_y', (capacity, ORB_SLOTS), float),
+            ('orb_r', (capacity, ORB_SLOTS), float), ('orb_active', (capacity, ORB_SLOTS), bool),
+        )
+
+    def _grow(self, capacity):
+        old_capacity = self.capacity
+        for name, shape, dtype in self._columns(capacity):
+            array = np.zeros(shape, dtype=dtype)
+            if old_capacity:
+                array[:old_capacity] = getattr(self, name)
+            setattr(self, name, array)
+        self.states.extend([None] * (capacity - old_capacity))
+        self.obstacles_versions.extend([-1] * (capacity - old_capacity))
+        self.free_slots.extend(range(capacity - 1, old_capacity - 1, -1))
+        self.capacity = capacity
+
+    # ----------------------- Ajout / retrait -----------------------
+    def add_game(self, state):
+        """Range la partie dans un slot : balle et raquettes deviennent des vues sur les tableaux."""
+        if len(state.bumpers) > BUMPER_SLOTS or len(state.powerup_orbs) > ORB_SLOTS:
+            raise ValueError(f"[vectorized] game_id={state.game_id} : trop d'orbes ou de bumpers.")
+        if not self.free_slots:
+            self._grow(self.capacity * 2)
+        slot = self.free_slots.pop()
+
+        self.slots[str(state.game_id)] = slot
+        self.states[slot] = state
+        self.step_scale[slot] = state.step_scale
+        state.ball = ArrayBall(self, slot, state.ball)
+        state.paddle_left = ArrayPaddle(self, slot, 0, state.paddle_left)
+        state.paddle_right = ArrayPaddle(self, slot, 1, state.paddle_right)
+        self._load_obstacles(slot, state)
+        return slot
+
+    def remove_game(self, game_id):
+        """Libère le slot ; la partie retrouve des objets Python ordinaires."""
+        slot = self.slots.pop(str(game_id), None)
+        if slot is None:
+            return
+        state = self.states[slot]
+        state.ball = state.ball.detach()
+        state.paddle_left = state.paddle_left.detach()
+        state.paddle_right = state.paddle_right.detach()
+        self.states[slot] = None
+        self.obstacles_versions[slot] = -1
+        self.bumper_active[slot] = False
+        self.orb_active[slot] = False
+        self.free_slots.append(slot)
+
+    def _load_obstacles(self, slot, state):
+        """Recopie orbes et bumpers (ne change qu'au spawn / a l'expiration)."""
+        self.bumper_active[slot] = False
+        for i, bumper in enumerate(state.bumpers):
+            if bumper.active:
+                self.bumper_active[slot, i] = True
+                self.bumper_x[slot, i] = bumper.x
+                self.bumper_y[slot, i] = bumper.y
+                self.bumper_r[slot, i] = bumper.size
+
+        self.orb_active[slot] = False
+        for i, orb in enumerate(state.powerup_orbs):
+            if orb.active:
+                self.orb_active[slot, i] = True
+                self.orb_x[slot, i] = orb.x
+                self.orb_y[slot, i] = orb.y
+                self.orb_r[slot, i] = orb.size
+        self.obstacles_versions[slot] = state.obstacles_version
+
+    # --------------------------- Tick ------------------------------
+    async def step(self, entries):
+        """
+        Avance d'un tick les parties [(state, parameters), ...].
+        Retourne { game_id: True (partie terminée) ou l'exception levée }.
+        """
+        results = {}
+        running = []
+        for state, parameters in entries:
+            if not state.pending_scorer:
+                # Cas courant de begin_step, sans créer de coroutine
+                state.tick += 1
+                expire_effects(state)
+                running.append((state, parameters))
+                continue
+            try:
+                status = await begin_step(state)
+            except Exception as e:
+                results[state.game_id] = e
+                continue
+            if status:
+                results[state.game_id] = True
+            elif status is None:
+                running.append((state, parameters))
+        # Une partie retirée pendant un await (run_game annulé) n'a plus de slot
+        running = [entry for entry in running if self._registered(entry[0])]
+        if not running:
+            return results
+
+        # 1) Parties avec effet actif ou balle collée : raquettes et balle en scalaire
+        slots, plain_slots, inputs, moving = [], [], [], []
+        for state, _ in running:
+            slot = state.ball._index
+            slots.append(slot)
+            if state.effects['left'] or state.effects['right'] or state.ball_stuck:
+                move_paddles(state)
+                if state.ball_stuck:
+                    move_ball_sticky(state)
+                else:
+                    moving.append(slot)
+            else:
+                plain_slots.append(slot)
+                moving.append(slot)
+                inputs.append((state.velocity['left'], state.velocity['right']))
+            if state.obstacles_version != self.obstacles_versions[slot]:
+                self._load_obstacles(slot, state)
+
+        # 2) Déplacement et détection pour toutes les autres parties
+        slots = np.array(slots, dtype=np.intp)
+        self._move_paddles(np.array(plain_slots, dtype=np.intp), np.array(inputs).reshape(-1, 2))
+        moving = np.array(moving, dtype=np.intp)
+        self.ball_from_x[slots] = self.ball_x[slots]
+        self.ball_from_y[slots] = self.ball_y[slots]
+        self.ball_x[moving] += self.ball_vx[moving] * self.step_scale[moving]
+        self.ball_y[moving] += self.ball_vy[moving] * self.step_scale[moving]
+        border, bumpers, orbs, paddles = self._detect(slots)
+        flagged = np.flatnonzero(border | bumpers | orbs | paddles)
+
+        # 3) Résolution scalaire des seules parties qui touchent quelque chose
+        scorers = {}
+        for i in flagged:
+            state = running[i][0]
+            if not self._registered(state):
+                continue
+            slot = slots[i]
+            state.ball_from = (float(self.ball_from_x[slot]), float(self.ball_from_y[slot]))
+            # Un rebond (bord, bumper) change le trajet détecté : les tests suivants sont rejoués
+            bounced = border[i] or bumpers[i]
+            try:
+                scorers[i] = await resolve_collisions(
+                    state, border=border[i], bumpers=bumpers[i] or border[i],
+                    powerups=orbs[i] or bounced, paddles=paddles[i] or bounced)
+            except Exception as e:
+                results[state.game_id] = e
+
+        # 4) Point marqué ou spawn/expiration des objets
+        for i, (state, parameters) in enumerate(running):
+            scorer = scorers.get(i)
+            if not scorer and state.tick < state.spawns.next_due:
+                continue
+            if state.game_id in results or not self._registered(state):
+                continue
+            try:
+                await end_step(state, parameters, scorer)
+            except Exception as e:
+                results[state.game_id] = e
+        return results
+
+    def _registered(self, state):
+        """La partie occupe-t-elle toujours son slot ?"""
+        slot = self.slots.get(str(state.game_id))
+        return slot is not None and self.states[slot] is state
+
+    def _move_paddles(self, slots, inputs):
+        """Paddle.move sans effet (ni glace ni boost) pour toutes les raquettes de slots."""
+        if not len(slots):
+            return
+        height = self.paddle_h[slots]
+        velocity = np.sign(inputs) * self.paddle_speed[slots]
+        new_y = self.paddle_y[slots] + velocity * self.step_scale[slots][:, None]
+
+        top = new_y < TERRAIN_TOP
+        bottom = ~top & (new_y + height > TERRAIN_BOTTOM)
+        new_y[top] = TERRAIN_TOP
+        new_y[bottom] = (TERRAIN_BOTTOM - height)[bottom]
+        velocity[top | bottom] = 0
+
+        self.paddle_y[slots] = new_y
+        self.paddle_v[slots] = velocity
+
+    def _detect(self, slots):
+        """
+        Masques (un booléen par partie de slots) des tests de collision a
+        rejouer en scalaire. Mêmes comparaisons que collisions.py, les distances
+        avec une marge DETECTION_SLACK pour ne jamais manquer un contact.
+        """
+        x = self.ball_x[slots]
+        y = self.ball_y[slots]
+        from_x = self.ball_from_x[slots]
+        from_y = self.ball_from_y[slots]
+        size = self.ball_size[slots]
+
+        border = (y - size <= TERRAIN_TOP) | (y + size >= TERRAIN_BOTTOM)
+        bumpers = self._touches(from_x, from_y, x, y, size, self.bumper_x[slots], self.bumper_y[slots],
+                                self.bumper_r[slots], self.bumper_active[slots])
+        orbs = self._touches(from_x, from_y, x, y, size, self.orb_x[slots], self.orb_y[slots],
+                             self.orb_r[slots], self.orb_active[slots])
+
+        # Buts et rebonds paddles : la balle atteint la ligne d'une raquette
+        paddle_x = self.paddle_x[slots]
+        paddle_w = self.paddle_w[slots]
+        paddles = (x - size <= paddle_x[:, 0] + paddle_w[:, 0]) \
+            | (x + size >= paddle_x[:, 1] - paddle_w[:, 1])
+        return border, bumpers, orbs, paddles
+
+    @staticmethod
+    def _touches(from_x, from_y, x, y, size, obj_x, obj_y, obj_r, active):
+        """Le trajet (from -> x, y) de la balle passe-t-il a portée d'un objet actif ?"""
+        move_x = (x - from_x)[:, None]
+        move_y = (y - from_y)[:, None]
+        rel_x = obj_x - from_x[:, None]
+        rel_y = obj_y - from_y[:, None]
+        length2 = move_x * move_x + move_y * move_y
+        # Point du trajet le plus proche de l'objet
+        t = np.clip((rel_x * move_x + rel_y * move_y) / np.where(length2 > 0, length2, 1), 0, 1)
+        dx = rel_x - t * move_x
+        dy = rel_y - t * move_y
+        reach = (size[:, None] + obj_r) * (1 + DETECTION_SLACK)
+        return np.any(active & (dx * dx + dy * dy <= reach * reach), axis=1)
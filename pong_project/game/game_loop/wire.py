@@ -0,0 +1,71 @@
+# game/game_loop/wire.py
+#
+# Format binaire (optionnel) des frames game_state, pour les clients qui se
+# connectent avec ?proto=bin. Le décodeur est dans static/js/game/live_game.js
+# (decodeGameState) : les deux DOIVENT rester synchronisés.
+#
+# Frame (little-endian), toujours l'état complet :
+#   header  B version, B flags, I seq, I tick, d t (ms, horloge monotone du serveur)
+#   balle   4f x, y, speed_x, speed_y ; B size
+#   paddles 2f y gauche/droite ; 2H hauteurs ; B largeur
+#   score   2B gauche/droite
+#   effets  H bitmask (bit = side_index * len(EFFECTS) + effect_index)
+#   entrées 2I dernier numéro de séquence appliqué gauche/droite
+#   orbes   B nombre, puis par orbe : B type, 2f x, y
+#   bumpers B nombre, puis par bumper : 2f x, y ; B size
+#   events  H longueur, puis les événements du tick en JSON UTF-8 (rares : pas de format dédié)
+
+import json
+import struct
+
+WIRE_VERSION = 4
+
+FLAG_FLASH = 0x01
+
+HEADER = struct.Struct('<BBIId4fB2f2HB2BH2I')
+COUNT = struct.Struct('<B')
+LENGTH = struct.Struct('<H')
+ORB = struct.Struct('<B2f')
+BUMPER = struct.Struct('<2fB')
+
+# input_seq_left / input_seq_right sont packés en uint32 (I) : plus grand seq accepté d'un client
+MAX_INPUT_SEQ = 2**32 - 1
+
+# Index des types d'orbes et des effets (ordre partagé avec le décodeur JS)
+ORB_TYPES = ('invert', 'shrink', 'ice', 'speed', 'flash', 'sticky')
+EFFECTS = ('inverted', 'ice_effect', 'speed_boost', 'sticky')
+SIDES = ('left', 'right')
+
+def effects_bitmask(state):
+    mask = 0
+    for side_index, side in enumerate(SIDES):
+        for effect_index, effect in enumerate(EFFECTS):
+            if effect in state.effects[side]:
+                mask |= 1 << (side_index * len(EFFECTS) + effect_index)
+    return mask
+
+def pack_game_state(data):
+    """Encode une frame game_state complète (dict de build_game_state + 'seq', 'tick', 't', 'events')."""
+    flags = FLAG_FLASH if data['flash_effect'] else 0
+    parts = [HEADER.pack(
+        WIRE_VERSION, flags, data['seq'], data['tick'], data['t'],
+        data['ball_x'], data['ball_y'], data['ball_speed_x'], data['ball_speed_y'], int(data['ball_size']),
+        data['paddle_left_y'], data['paddle_right_y'],
+        int(data['paddle_left_height']), int(data['paddle_right_height']), int(data['paddle_width']),
+        data['score_left'], data['score_right'],
+        data['effects'],
+        data['input_seq_left'], data['input_seq_right'],
+    )]
+
+    parts.append(COUNT.pack(len(data['powerups'])))
+    for orb in data['powerups']:
+        parts.append(ORB.pack(ORB_TYPES.index(orb['type']), orb['x'], orb['y']))
+
+    parts.append(COUNT.pack(len(data['bumpers'])))
+    for bumper in data['bumpers']:
+        parts.append(BUMPER.pack(bumper['x'], bumper['y'], int(bumper['size'])))
+
+    events = json.dumps(data['events']).encode() if data['events'] else b''
+    parts.append(LENGTH.pack(len(events)))
+    parts.append(events)
+    return b''.join(parts)
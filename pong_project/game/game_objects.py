@@ -1,7 +1,5 @@
 # game/game_objects.py
 
-import random
-import math
 import time
 
 class Paddle: 
@@ -20,19 +18,20 @@ class Paddle:
         self.velocity = 0
         # self.shown_size = size  # Current displayed size
 
-    def move(self, direction, is_on_ice, terrain_top, terrain_bottom, speed_boost=False):
+    def move(self, direction, is_on_ice, terrain_top, terrain_bottom, speed_boost=False, step_scale=1.0):
+        # step_scale : durée du tick en ticks de 1/90 s (GameState.step_scale)
         ice_acceleration = 0.5
         ice_friction = 0.02
         if is_on_ice:
             if direction != 0:
-                self.velocity += direction * ice_acceleration
-            self.velocity *= (1 - ice_friction)
+                self.velocity += direction * ice_acceleration * step_scale
+            self.velocity *= (1 - ice_friction) ** step_scale
         else:
             speed = self.speed * 1.5 if speed_boost else self.speed
             self.velocity = direction * speed
 
         # Apply movement with boundary checking
-        new_y = self.y + self.velocity
+        new_y = self.y + self.velocity * step_scale
         if new_y < terrain_top:
             new_y = terrain_top
             self.velocity = 0
@@ -66,7 +65,7 @@ class Ball:
         self.last_player = None  # Réinitialiser le dernier joueur
 
 class PowerUpOrb:
-    def __init__(self, game_id, effect_type, terrain_rect, color=None):
+    def __init__(self, game_id, effect_type, color=None):
         self.game_id = game_id
         self.effect_type = effect_type  # 'invert', 'shrink', 'ice', 'speed', 'sticky', 'flash'
         self.size = 15
@@ -81,14 +80,6 @@ class PowerUpOrb:
         self.in_cooldown = False
         self.cooldown_end_time = 0
 
-        # Define spawn area boundaries (25% to 75% of field width) / added
-        self.spawn_area = {
-            'left': terrain_rect['left'] + (terrain_rect['width'] * 0.25),
-            'right': terrain_rect['left'] + (terrain_rect['width'] * 0.75),
-            'top': terrain_rect['top'] + (terrain_rect['height'] * 0.1),
-            'bottom': terrain_rect['top'] + (terrain_rect['height'] * 0.9)
-        }
-
     def get_default_color(self):
         colors = {
             'invert': (255, 105, 180),  # Pink
@@ -116,69 +107,15 @@ class PowerUpOrb:
             return True
         return False
 
-    def check_position_valid(self, x, y, powerup_orbs, bumpers):
-        # Check distance from other powerups / added
-        MIN_POWERUP_DISTANCE = 40
-        MIN_BUMPER_DISTANCE = 40
-
-        #Debug count
-        active_powerups = 0
-        active_bumpers = 0
-
-        for orb in powerup_orbs:
-            if orb.active and orb != self:
-                active_powerups += 1
-                distance = math.hypot(x - orb.x, y - orb.y)
-                print(f"[DEBUG] PowerUp checking distance to other powerup: {distance}")
-                if distance < MIN_POWERUP_DISTANCE:
-                    print(f"[DEBUG] PowerUp spawn rejected: too close to other powerup ({distance} < {MIN_POWERUP_DISTANCE})")
-                    return False
-
-        # Check distance from bumpers
-        MIN_BUMPER_DISTANCE = 40
-        for bumper in bumpers:
-            if bumper.active:
-                active_bumpers += 1
-                distance = math.hypot(x - bumper.x, y - bumper.y)
-                print(f"[DEBUG] PowerUp checking distance to bumper: {distance}")
-                if distance < MIN_BUMPER_DISTANCE:
-                    print(f"[DEBUG] PowerUp spawn rejected: too close to bumper ({distance} < {MIN_BUMPER_DISTANCE})")
-                    return False
-        print(f"[DEBUG] PowerUp spawn position check complete. Checked against {active_powerups} active powerups and {active_bumpers} active bumpers")
-        return True
-
-    def spawn(self, terrain_rect, powerup_orbs=None, bumpers=None):
+    def spawn(self, position):
+        """Fait apparaître l'orbe en position (x, y), choisie par game_loop/spawn_points.py."""
         if self.active or self.check_cooldown():
             return False
-        if powerup_orbs is None:
-            powerup_orbs = []
-        if bumpers is None:
-            bumpers = []
-
-        max_attempts = 100
-
-        for attempt in range(max_attempts):
-            # Spawn within the defined middle area / modified
-            new_x = random.uniform(self.spawn_area['left'], self.spawn_area['right'])
-            new_y = random.uniform(self.spawn_area['top'], self.spawn_area['bottom'])
-
-            # Additional check to ensure better distribution in the middle
-            center_x = terrain_rect['left'] + (terrain_rect['width'] / 2)
-            if abs(new_x - center_x) < 50:  # If too close to center, try again
-                continue
-
-            # Check if position is valid (not too close to other objects) / added
-            if self.check_position_valid(new_x, new_y, powerup_orbs, bumpers):
-                self.x = new_x
-                self.y = new_y
-                self.rect = (self.x, self.y, self.size, self.size)
-                self.active = True
-                self.spawn_time = time.time()
-                print(f"[DEBUG] Successfully spawned powerup after {attempt + 1} attempts")
-                return True
-            else:
-                print(f"[DEBUG] Attempt {attempt + 1} failed validation")
-        return False
+        self.x, self.y = position
+        self.rect = (self.x, self.y, self.size, self.size)
+        self.active = True
+        self.spawn_time = time.time()
+        return True
 
     def activate(self):
         self.active = True
@@ -192,7 +129,7 @@ class PowerUpOrb:
         self.start_cooldown()
 
 class Bumper:
-    def __init__(self, game_id, terrain_rect):
+    def __init__(self, game_id):
         self.game_id = game_id
         self.size = 20
         self.color = (255, 255, 255)  # White
@@ -204,87 +141,111 @@ class Bumper:
         self.duration = 10
         self.last_collision_time = 0 
 
-        # Define spawn area boundaries (40% to 60% of field width for more central placement) / added
-        self.spawn_area = {
-            'left': terrain_rect['left'] + (terrain_rect['width'] * 0.25),
-            'right': terrain_rect['left'] + (terrain_rect['width'] * 0.75),
-            'top': terrain_rect['top'] + (terrain_rect['height'] * 0.1),
-            'bottom': terrain_rect['top'] + (terrain_rect['height'] * 0.9)
-        }
-
-    def check_position_valid(self, x, y, powerup_orbs, bumpers): # / added
-        # Check distance from powerups
-        MIN_POWERUP_DISTANCE = 40
-        MIN_BUMPER_DISTANCE = 40
-
-        # Debug counters
-        active_powerups = 0
-        active_bumpers = 0
-
-        for orb in powerup_orbs:
-            if orb.active:
-                active_powerups += 1
-                distance = math.hypot(x - orb.x, y - orb.y)
-                print(f"[DEBUG] Bumper checking distance to powerup: {distance}")
-                if distance < MIN_POWERUP_DISTANCE:
-                    print(f"[DEBUG] Bumper spawn rejected: too close to powerup ({distance} < {MIN_POWERUP_DISTANCE})")
-                    return False
-
-        # Check distance from other bumpers
-        MIN_BUMPER_DISTANCE = 40
-        for bumper in bumpers:
-            if bumper.active and bumper != self:
-                active_bumpers += 1
-                distance = math.hypot(x - bumper.x, y - bumper.y)
-                print(f"[DEBUG] Bumper checking distance to other bumper: {distance}")
-                if distance < MIN_BUMPER_DISTANCE:
-                    print(f"[DEBUG] Bumper spawn rejected: too close to other bumper ({distance} < {MIN_BUMPER_DISTANCE})")
-                    return False
-        print(f"[DEBUG] Bumper spawn position check complete. Checked against {active_powerups} active powerups and {active_bumpers} active bumpers")
-        return True
-
-    def spawn(self, terrain_rect, powerup_orbs=None, bumpers=None):
+    def spawn(self, position):
+        """Fait apparaître le bumper en position (x, y), choisie par game_loop/spawn_points.py."""
         if self.active:
             return False
-
-        if powerup_orbs is None:
-            powerup_orbs = []
-        if bumpers is None:
-            bumpers = []
-
-        max_attempts = 100
-
-        # left = terrain_rect['left']
-        # right = terrain_rect['left'] + terrain_rect['width']
-        # top = terrain_rect['top']
-        # bottom = terrain_rect['top'] + terrain_rect['height'] / removed
-
-        for _ in range(max_attempts):
-            # Spawn within the defined middle area / modified
-            new_x = random.uniform(self.spawn_area['left'], self.spawn_area['right'])
-            new_y = random.uniform(self.spawn_area['top'], self.spawn_area['bottom'])
-
-            # Check distance from center to avoid too much clustering
-            center_x = terrain_rect['left'] + (terrain_rect['width'] / 2)
-            center_y = terrain_rect['top'] + (terrain_rect['height'] / 2)
-            dist_to_center = math.hypot(new_x - center_x, new_y - center_y)
-            
-            if dist_to_center < 30:  # If too close to center, try again
-                continue
-
-            # Check if position is valid (not too close to other objects)
-            if self.check_position_valid(new_x, new_y, powerup_orbs, bumpers):
-                self.x = new_x
-                self.y = new_y
-                self.rect = (self.x, self.y, self.size, self.size)
-                self.active = True
-                self.spawn_time = time.time()
-                return True
-
-        return False
+        self.x, self.y = position
+        self.rect = (self.x, self.y, self.size, self.size)
+        self.active = True
+        self.spawn_time = time.time()
+        return True
     
     def activate(self):
         self.active = True
 
     def deactivate(self):
         self.active = False
+
+
+class GameState:
+    """
+    État autoritaire d'une partie, conservé en mémoire par la boucle de jeu.
+    Redis ne sert plus que de snapshot périodique (voir state_utils.py).
+    """
+    def __init__(self, game_id, paddle_left, paddle_right, ball, powerup_orbs, bumpers,
+                 initial_paddle_height, initial_ball_speed):
+        self.game_id = game_id
+        self.tick = 0
+        self.last_snapshot_tick = 0
+
+        # Objets de jeu
+        self.paddle_left = paddle_left
+        self.paddle_right = paddle_right
+        self.ball = ball
+        self.powerup_orbs = powerup_orbs
+        self.bumpers = bumpers
+        # Incrémenté a chaque spawn/disparition d'orbe ou de bumper
+        self.obstacles_version = 0
+        # Echéances de spawn/disparition (SpawnSchedule, créé par initialize_game_state)
+        self.spawns = None
+        # Positions d'apparition libres (SpawnPoints, créé par initialize_game_state)
+        self.spawn_points = None
+        # Index des obstacles actifs pour les collisions de la balle (ObstacleGrid, idem)
+        self.obstacle_grid = None
+
+        # Valeurs initiales (reset apres un point)
+        self.initial_paddle_height = initial_paddle_height
+        self.initial_ball_speed = initial_ball_speed
+
+        # Entrées des joueurs (velocity envoyée par le PongConsumer)
+        self.velocity = {'left': 0.0, 'right': 0.0}
+        # Dernier numéro de séquence d'entrée appliqué par joueur (renvoyé dans les frames)
+        self.input_seq = {'left': 0, 'right': 0}
+
+        # Effets actifs par côté : 'inverted', 'ice_effect', 'speed_boost', 'sticky'
+        self.effects = {'left': set(), 'right': set()}
+        self.original_height = {'left': None, 'right': None}
+        self.flash_effect = False
+        # Fin des effets : tas de (tick, 'effet:côté') avancé a chaque tick (voir game_loop/timers.py)
+        self.timers = []
+        self.timer_deadlines = {}
+        self.tick_rate = 90  # ticks de simulation par seconde (fixé par game_loop)
+        # Déplacement par tick = vitesse * step_scale (vitesses en px par 1/90 s, voir loop.SPEED_TICK_RATE)
+        self.step_scale = 1.0
+        # Début du trajet de la balle pendant le tick (détection continue, voir collisions.py)
+        self.ball_from = (ball.x, ball.y)
+
+        # Score (pending_scorer : point en attente pendant la pause après un but)
+        self.score = {'left': 0, 'right': 0}
+        self.pending_scorer = None
+        self.resume_time = 0
+
+        # Balle collée (powerup sticky)
+        self.ball_stuck = False
+        self.stuck_side = None
+        self.sticky_relative_pos = 0
+        self.ball_original_speed = None
+
+        # Frames game_state envoyées (protocole keyframe + deltas, voir broadcast.py)
+        self.frame_seq = 0
+        self.last_frame = None
+        self.last_keyframe_seq = 0
+        self.keyframe_requested = False
+        # Événements du tick (collisions, spawns...) envoyés avec la prochaine frame
+        self.events = []
+        # Cadence d'envoi (ticks entre deux frames, peut être fractionnaire : 90 Hz / 60 Hz = 1.5)
+        self.broadcast_interval = 1
+        self.next_broadcast_tick = 0
+
+        # Boost de vitesse apres un relâchement sticky
+        self.ball_speed_boosted = False
+        self.ball_speed_already_boosted = False
+        self.ball_speed_before_boost = None
+
+    def get_paddle(self, side):
+        return self.paddle_left if side == 'left' else self.paddle_right
+
+    def has_effect(self, side, effect):
+        return effect in self.effects[side]
+
+    def obstacles_changed(self):
+        self.obstacles_version += 1
+
+    def clear_effects(self):
+        for side in ('left', 'right'):
+            self.effects[side].clear()
+            self.original_height[side] = None
+        self.flash_effect = False
+        self.timers.clear()
+        self.timer_deadlines.clear()
@@ -0,0 +1,82 @@
+# game/mailbox.py
+#
+# Boîte d'envoi d'une connexion WebSocket (une par PongConsumer).
+#
+# Avant, chaque frame game_state attendait son tour dans le channel layer :
+# un client lent prenait du retard sur le temps réel et la liste Redis de son
+# canal grossissait jusqu'a la capacity. Ici :
+#   - frames game_state ordinaires : un seul emplacement, qui ne garde que
+#     l'état le plus récent ;
+#   - messages fiables (countdown, game_over, frames qui portent des
+#     événements : but, collisions...) : file ordonnée, jamais abandonnés.
+# Client binaire : chaque frame est l'état complet, la dernière remplace celle
+# qui n'est pas encore partie (comptée dans dropped).
+# Client texte : un delta arrivé avant le départ de la frame en attente y est
+# fusionné (merged) ; la frame en attente couvre alors les deux. Une keyframe
+# en attente reste une keyframe, un delta fusionné porte 'seq_from' (premier
+# seq couvert) : le client ne voit pas de trou et ne redemande pas de keyframe.
+
+import asyncio
+import json
+from collections import deque
+
+class Mailbox:
+    def __init__(self, frame_format='text'):
+        self.frame_format = frame_format  # 'text' (JSON, deltas) ou 'bytes' (binaire, état complet)
+        self.latest = None      # dernière frame game_state pas encore envoyée
+        self.ordered = deque()  # messages fiables, dans l'ordre
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.merged = 0
+
+    def put_frame(self, message):
+        """Frame game_state : remplace ou complète la précédente, sauf si elle porte des événements."""
+        if message.get('reliable'):
+            self.put(message)
+            return
+        if self.latest is not None:
+            message = self.merge(self.latest, message)
+        self.latest = message
+        self.ready.set()
+
+    def merge(self, pending, message):
+        """Frame qui part a la place de pending (pas encore envoyée) et de message."""
+        text, pending_text = message.get('text'), pending.get('text')
+        if self.frame_format != 'text' or message.get('keyframe') or text is None or pending_text is None:
+            # État complet (binaire ou keyframe) : le plus récent suffit
+            self.dropped += 1
+            return message
+        frame, delta = json.loads(pending_text), json.loads(text)
+        if not frame.get('keyframe'):
+            delta['seq_from'] = frame.get('seq_from', frame['seq'])
+        frame.update(delta)
+        self.merged += 1
+        # Le message est partagé entre les consumers du processus (game/fanout.py) : copie
+        return dict(pending, text=json.dumps(frame))
+
+    def put(self, message):
+        # La frame en attente est plus ancienne que message : elle part avant, dans l'ordre
+        if self.latest is not None:
+            self.ordered.append(self.latest)
+            self.latest = None
+        self.ordered.append(message)
+        self.ready.set()
+
+    async def get(self):
+        while not self.ordered and self.latest is None:
+            self.ready.clear()
+            await self.ready.wait()
+        self.sent += 1
+        if self.ordered:
+            return self.ordered.popleft()
+        message, self.latest = self.latest, None
+        return message
+
+    def stats(self):
+        return {
+            'sent': self.sent,
+            'dropped': self.dropped,
+            'merged': self.merged,
+            'pending': len(self.ordered) + (self.latest is not None),
+        }
@@ -1,7 +1,9 @@
 # game/manager.py
 
 import asyncio
-from game.tasks import start_game_loop
+from channels.layers import get_channel_layer
+from game.tasks import start_game_loop, stop_game
+from game.sharding import worker_channel
 import sys
 
 _GLOBAL_LOOP = None
@@ -15,17 +17,41 @@ def get_global_loop():
     return _GLOBAL_LOOP
 
 def schedule_game(game_id):
+    """
+    Lance la boucle de jeu de game_id : dans ce processus, ou sur le game worker
+    qui lui est attribué (settings.GAME_WORKERS > 0, voir game/sharding.py).
+    """
+    if worker_channel(game_id):
+        _submit(send_to_worker(game_id, "game.start"), game_id)
+    else:
+        _submit(start_game_loop(game_id), game_id)
+
+async def send_to_worker(game_id, message_type):
+    """Envoie un ordre (game.start / game.stop) au worker qui simule game_id."""
+    channel = worker_channel(game_id)
+    await get_channel_layer().send(channel, {"type": message_type, "game_id": str(game_id)})
+    print(f"[manager.py] {message_type} envoyé a {channel} pour game_id={game_id}")
+
+async def request_stop_game(game_id):
+    """Arrête la partie, qu'elle tourne dans ce processus ou sur un game worker."""
+    if worker_channel(game_id):
+        await send_to_worker(game_id, "game.stop")
+    else:
+        await stop_game(game_id)
+
+def _submit(coro, game_id):
     try:
         current_loop = asyncio.get_event_loop()
         if not current_loop.is_running():
             raise RuntimeError("Event loop is not running")
-        current_loop.create_task(start_game_loop(game_id))
+        current_loop.create_task(coro)
         print(f"[schedule_game] create_task OK dans loop={current_loop} pour game_id={game_id}")
     except (RuntimeError, AttributeError) as e:
         print("No current event loop in this thread, fallback run_coroutine_threadsafe", file=sys.stderr)
         global_loop = get_global_loop()
         if global_loop and global_loop.is_running():
-            future = asyncio.run_coroutine_threadsafe(start_game_loop(game_id), global_loop)
+            future = asyncio.run_coroutine_threadsafe(coro, global_loop)
             print(f"[schedule_game] run_coroutine_threadsafe OK dans global_loop={global_loop} pour game_id={game_id}")
         else:
+            coro.close()
             print("No global loop available or loop is not running, game cannot be scheduled.", file=sys.stderr)
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('game', '0002_alter_gamesession_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='gameparameters',
+            name='broadcast_rate',
+            field=models.PositiveSmallIntegerField(blank=True, choices=[(30, '30 Hz'), (45, '45 Hz'), (60, '60 Hz'), (90, '90 Hz')], null=True),
+        ),
+    ]
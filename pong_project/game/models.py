@@ -291,12 +291,15 @@ class GameParameters(models.Model):
     """
     BALL_SPEED_CHOICES = [(1, 'Slow'), (2, 'Medium'), (3, 'Fast')]
     PADDLE_SIZE_CHOICES = [(1, 'Small'), (2, 'Medium'), (3, 'Large')]
+    BROADCAST_RATE_CHOICES = [(30, '30 Hz'), (45, '45 Hz'), (60, '60 Hz'), (90, '90 Hz')]
 
     game_session = models.OneToOneField(GameSession, related_name='parameters', on_delete=models.CASCADE)
     ball_speed = models.PositiveSmallIntegerField(choices=BALL_SPEED_CHOICES, default=2)
     paddle_size = models.PositiveSmallIntegerField(choices=PADDLE_SIZE_CHOICES, default=2)
     bonus_enabled = models.BooleanField(default=True)
     obstacles_enabled = models.BooleanField(default=False)
+    # Fréquence d'envoi des frames game_state (None : settings.GAME_BROADCAST_RATE)
+    broadcast_rate = models.PositiveSmallIntegerField(choices=BROADCAST_RATE_CHOICES, null=True, blank=True)
 
     def __str__(self):
         return (f"Ball speed: {self.get_ball_speed_display()}, "
@@ -0,0 +1,23 @@
+# game/ratelimit.py
+#
+# Seau a jetons (token bucket) : limite le débit de messages d'une connexion
+# WebSocket sans bloquer (voir PongConsumer.receive).
+
+import time
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate      # jetons ajoutés par seconde
+        self.burst = burst    # jetons au plus (rafale autorisée)
+        self.tokens = burst
+        self.last = time.monotonic()
+
+    def take(self):
+        """Consomme un jeton. Retourne False si le seau est vide."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
@@ -0,0 +1,57 @@
+# game/sharding.py
+#
+# Répartition des parties sur plusieurs processus "game worker" (un par coeur).
+#
+# Chaque worker est un `python manage.py runworker game-worker-<i>` qui écoute
+# son canal sur le channel layer Redis (voir GameWorkerConsumer dans consumers.py).
+# Une partie est attribuée a un worker par hachage cohérent de son game_id :
+# tous les processus (uvicorn, workers) calculent la même attribution sans
+# se concerter, et ajouter un worker ne déplace qu'environ 1/N des parties.
+#
+# Les entrées (canal de l'inbox de la partie, voir game_loop/inbox.py) et les
+# frames (group_send sur pong_<game_id>) passent par le channel layer Redis :
+# le PongConsumer n'a pas besoin de savoir quel processus simule sa partie.
+
+import bisect
+import hashlib
+from django.conf import settings
+
+WORKER_CHANNEL_PREFIX = "game-worker-"
+VIRTUAL_NODES = 160  # points par worker sur l'anneau (répartition plus régulière)
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+class HashRing:
+    """Anneau de hachage cohérent : game_id -> nom de worker."""
+    def __init__(self, nodes, virtual_nodes=VIRTUAL_NODES):
+        self.ring = sorted(
+            (_hash(f"{node}#{i}"), node)
+            for node in nodes
+            for i in range(virtual_nodes)
+        )
+        self.keys = [key for key, _ in self.ring]
+
+    def get_node(self, key):
+        if not self.ring:
+            return None
+        index = bisect.bisect(self.keys, _hash(str(key))) % len(self.ring)
+        return self.ring[index][1]
+
+def worker_channels():
+    """Noms des canaux des workers configurés (liste vide si GAME_WORKERS = 0)."""
+    return [f"{WORKER_CHANNEL_PREFIX}{i}" for i in range(settings.GAME_WORKERS)]
+
+_RING = None
+
+def get_ring():
+    global _RING
+    if _RING is None:
+        _RING = HashRing(worker_channels())
+    return _RING
+
+def worker_channel(game_id):
+    """Canal du worker qui simule game_id, ou None si les parties tournent dans uvicorn."""
+    if not settings.GAME_WORKERS:
+        return None
+    return get_ring().get_node(game_id)
@@ -0,0 +1,26 @@
+# game/signals.py
+
+from django.db.models.signals import post_init, post_save
+from django.dispatch import receiver
+
+from .models import GameSession
+from .game_loop.status_utils import publish, set_status
+
+@receiver(post_init, sender=GameSession)
+def remember_status(sender, instance, **kwargs):
+    instance._initial_status = instance.status
+
+@receiver(post_save, sender=GameSession)
+def publish_status_change(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Prévient les boucles de jeu qu'un statut a changé : directement dans ce
+    processus, par pub/sub Redis pour les autres (voir status_utils.py).
+    """
+    if created or instance.status == instance._initial_status:
+        return
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    instance._initial_status = instance.status
+
+    set_status(instance.pk, instance.status)
+    publish(instance.pk, instance.status)
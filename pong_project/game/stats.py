@@ -0,0 +1,99 @@
+# game/stats.py
+#
+# Statistiques internes des processus de jeu (uvicorn et game workers) :
+# latence des connexions (ping/pong du PongConsumer), boîtes d'envoi, inbox,
+# cadence des boucles de jeu et pool de threads base de données.
+#
+# Chaque processus publie son rapport dans Redis (clé stats:<processus>,
+# expirée si le processus disparaît) toutes les PUBLISH_INTERVAL secondes.
+# La vue interne (game/views/gameStats.py) lit les rapports de tous les
+# processus et les regroupe par worker et par partie.
+
+import asyncio
+import json
+import os
+import socket
+import time
+from game import fanout
+from game.game_loop.redis_utils import r
+from game.game_loop.inbox import inbox_stats
+from game.game_loop.scheduler import scheduler_stats
+from game.game_loop.db_executor import db_executor_stats
+
+STATS_KEY_PREFIX = "stats:"
+PUBLISH_INTERVAL = 5
+REPORT_TTL = 3 * PUBLISH_INTERVAL
+
+PROCESS_NAME = f"{socket.gethostname()}:{os.getpid()}"
+
+_PUBLISHER = None
+
+def collect_process_stats():
+    """Rapport du processus courant."""
+    return {
+        'process': PROCESS_NAME,
+        'time': time.time(),
+        'hosted_games': fanout.hosted_games(),
+        'connections': fanout.connection_stats(),
+        'inboxes': inbox_stats(),
+        'schedulers': scheduler_stats(),
+        'db': db_executor_stats(),
+    }
+
+async def publish_stats():
+    while True:
+        try:
+            await r.set(STATS_KEY_PREFIX + PROCESS_NAME, json.dumps(collect_process_stats()), ex=REPORT_TTL)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[stats] Publication impossible : {e}")
+        await asyncio.sleep(PUBLISH_INTERVAL)
+
+def ensure_stats_publisher():
+    """Démarre (une fois par processus) la publication périodique du rapport."""
+    global _PUBLISHER
+    if _PUBLISHER is None or _PUBLISHER.done():
+        _PUBLISHER = asyncio.create_task(publish_stats())
+
+def read_reports(redis_client):
+    """Rapports de tous les processus (client Redis synchrone : appelé depuis une vue)."""
+    keys = list(redis_client.scan_iter(match=STATS_KEY_PREFIX + "*"))
+    return [json.loads(value) for value in redis_client.mget(keys) if value] if keys else []
+
+def _latency_summary(connections):
+    rtts = [c['rtt_ms'] for c in connections if c['rtt_ms'] is not None]
+    return {
+        'connections': len(connections),
+        'rtt_avg_ms': round(sum(rtts) / len(rtts), 1) if rtts else None,
+        'rtt_max_ms': round(max(rtts), 1) if rtts else None,
+        'frames_dropped': sum(c['dropped'] for c in connections),
+        'inputs_rejected': sum(c['inputs_rejected'] for c in connections),
+    }
+
+def aggregate_reports(reports):
+    """Regroupe les rapports par worker (processus) et par partie."""
+    workers = []
+    by_game = {}
+    for report in reports:
+        connections = report['connections']
+        workers.append(dict(
+            _latency_summary(connections),
+            process=report['process'],
+            age_s=round(time.time() - report['time'], 1),
+            hosted_games=len(report['hosted_games']),
+            schedulers=report['schedulers'],
+            db=report['db'],
+        ))
+        for connection in connections:
+            by_game.setdefault(connection['game_id'], []).append(connection)
+        for inbox in report['inboxes']:
+            by_game.setdefault(inbox['game_id'], [])
+
+    games = {}
+    for game_id, connections in by_game.items():
+        games[game_id] = _latency_summary(connections)
+        games[game_id]['workers'] = sorted({
+            report['process'] for report in reports if game_id in report['hosted_games']
+        })
+    return {'workers': workers, 'games': games}
@@ -36,18 +36,17 @@
 #         print(f"[stop_game] Aucune tâche trouvée pour game_id={game_id} !")
 
 from game.game_loop.models_utils import set_gameSession_status
+from game.game_loop.status_utils import set_status
 
 
 import asyncio
 
 ACTIVE_GAMES = {}   # { game_id: main_task }
-SUBTASKS = {}       # { game_id: set of subtasks }
 
 async def start_game_loop(game_id):
     from .game_loop.loop import game_loop
     task = asyncio.create_task(game_loop(game_id))
     ACTIVE_GAMES[str(game_id)] = task
-    SUBTASKS[str(game_id)] = set()  # Initialise le set pour les sous-tâches
 
     print(f"[tasks.py] Game loop started for game_id={game_id}")
     try:
@@ -55,38 +54,16 @@ async def start_game_loop(game_id):
     except asyncio.CancelledError:
         print(f"[tasks.py] Game loop for game_id={game_id} was cancelled.")
     finally:
-        del ACTIVE_GAMES[str(game_id)]
-        SUBTASKS.pop(str(game_id), None)
+        ACTIVE_GAMES.pop(str(game_id), None)
         print(f"[tasks.py] Game loop ended for game_id={game_id}")
 
-def register_subtask(game_id, subtask):
-    """Enregistre une sous-tâche pour le game_id."""
-    if str(game_id) not in SUBTASKS:
-        SUBTASKS[str(game_id)] = set()
-    SUBTASKS[str(game_id)].add(subtask)
-
-     # Option : cleanup dès que la tâche est terminée
-    def _on_done(_):
-        if game_id in SUBTASKS:
-            SUBTASKS[str(game_id)].discard(subtask)
-
-    subtask.add_done_callback(_on_done)
-
 async def stop_game(game_id):
-    """Annule la tâche principale ET toutes les sous-tâches associées."""
+    """Annule la tâche de la partie."""
+    # Le moteur groupé voit l'arrêt au tick suivant, sans requête en base
+    set_status(game_id, 'cancelled')
     # await set_gameSession_status(game_id, "cancelled")
     main_task = ACTIVE_GAMES.get(str(game_id))
     if main_task:
         main_task.cancel()
         print(f"[stop_game] Annulation de la tâche principale pour game_id={game_id}")
-    # # Annuler toutes les sous-tâches
-    # subtasks = SUBTASKS.get(str(game_id), [])
-    # for st in subtasks:
-    #     st.cancel()
-    # Annule toutes les sous-tâches
-    for st in SUBTASKS.get(str(game_id), []):
-        st.cancel()
-
-    SUBTASKS.pop(str(game_id), None)
     ACTIVE_GAMES.pop(str(game_id), None)
-    #print(f"[stop_game] {len(subtasks)} sous-tâches annulées pour game_id={game_id}")
\ No newline at end of file
@@ -1,3 +1,105 @@
-from django.test import TestCase
+import contextlib
+import io
+import random
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from . import game_objects
+from .game_loop import loop, score_utils
+from .game_loop.initialize_game import initialize_game_state
+from .game_loop.vectorized import VectorPhysics
+
+
+class FakeClock:
+    """Horloge des pauses après un but et des cooldowns d'orbes, avancée d'un tick a chaque pas."""
+    def __init__(self):
+        self.now = 0.0
+
+    def time(self):
+        return self.now
+
+    monotonic = time
+
+
+def ai_inputs(state, rng):
+    """Raquettes qui suivent la balle, avec des ratés (rng propre a la partie) pour qu'il y ait des points."""
+    for side, paddle in (('left', state.paddle_left), ('right', state.paddle_right)):
+        center = paddle.y + paddle.height / 2
+        if rng.random() < 0.3:
+            continue
+        if state.ball.y > center + 10:
+            state.velocity[side] = 8
+        elif state.ball.y < center - 10:
+            state.velocity[side] = -8
+        else:
+            state.velocity[side] = 0
+
+
+def game_snapshot(state):
+    ball = state.ball
+    return {
+        'tick': state.tick,
+        'ball': (ball.x, ball.y, ball.speed_x, ball.speed_y, ball.size, ball.last_player),
+        'paddles': (state.paddle_left.y, state.paddle_right.y, state.paddle_left.height, state.paddle_right.height),
+        'score': dict(state.score),
+        'pending_scorer': state.pending_scorer,
+        'effects': {side: sorted(effects) for side, effects in state.effects.items()},
+        'flash_effect': state.flash_effect,
+        'stuck': (state.ball_stuck, state.stuck_side),
+        'timers': dict(state.timer_deadlines),
+        'orbs': [(orb.active, orb.x, orb.y) for orb in state.powerup_orbs],
+        'bumpers': [(bumper.active, bumper.x, bumper.y) for bumper in state.bumpers],
+        'events': [event['type'] for event in state.events],
+    }
+
+
+class VectorPhysicsEquivalenceTest(SimpleTestCase):
+    """Le moteur vectorisé (VectorPhysics.step) doit reproduire step_game tick par tick."""
+    TICKS = 5000
+    SEEDS = (1, 2, 3)
+    BALL_SPEEDS = (1, 3)
+
+    async def run_game(self, seed, ball_speed, vector):
+        parameters = SimpleNamespace(paddle_size=2, ball_speed=ball_speed, bonus_enabled=True,
+                                     obstacles_enabled=True, broadcast_rate=None)
+        random.seed(seed)
+        rng = random.Random(seed)
+        clock = FakeClock()
+        trace = []
+        with mock.patch.object(loop, 'time', clock), mock.patch.object(game_objects, 'time', clock), \
+                mock.patch.object(loop, 'POINT_PAUSE', 0.2), mock.patch.object(score_utils, 'WIN_SCORE', 10**6), \
+                contextlib.redirect_stdout(io.StringIO()):
+            state = initialize_game_state(f'equiv-{seed}-{ball_speed}', parameters)
+            state.tick_rate = loop.TICK_RATE
+            state.step_scale = loop.SPEED_TICK_RATE / loop.TICK_RATE
+            physics = VectorPhysics(capacity=1) if vector else None
+            if physics:
+                physics.add_game(state)
+            for _ in range(self.TICKS):
+                ai_inputs(state, rng)
+                if physics:
+                    results = await physics.step([(state, parameters)])
+                    if state.game_id in results and results[state.game_id] is not True:
+                        raise results[state.game_id]
+                else:
+                    await loop.step_game(state, parameters, read_inputs=False)
+                trace.append(game_snapshot(state))
+                state.events.clear()
+                clock.now += 1 / loop.TICK_RATE
+        return trace
+
+    async def test_vector_matches_scalar(self):
+        for seed in self.SEEDS:
+            for ball_speed in self.BALL_SPEEDS:
+                with self.subTest(seed=seed, ball_speed=ball_speed):
+                    scalar = await self.run_game(seed, ball_speed, vector=False)
+                    vector = await self.run_game(seed, ball_speed, vector=True)
+                    for tick, (expected, actual) in enumerate(zip(scalar, vector)):
+                        self.assertEqual(expected, actual, f"divergence au tick {tick}")
+                    self.assertEqual(len(scalar), len(vector))
+                    # Le test couvre bien les points, les orbes et les bumpers
+                    self.assertGreater(sum(scalar[-1]['score'].values()), 0)
+                    self.assertTrue(any(active for snapshot in scalar for active, _, _ in snapshot['orbs']))
+                    self.assertTrue(any(active for snapshot in scalar for active, _, _ in snapshot['bumpers']))
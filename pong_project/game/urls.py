@@ -35,6 +35,7 @@ from .views.gameLoading import LoadingView
 from .views.gameLocal import StartLocalGameView, CreateGameLocalView
 from .views.gameResults import GameResultsView 
 from .views.gameStatus import GetGameStatusView 
+from .views.gameStats import GameStatsView
 from .views.gameOnline import CreateGameOnlineView, SendGameSessionInvitationView, AcceptGameInvitationView, RejectGameInvitationView, CleanExpiredInvitationsView, CheckGameInvitationStatusView, StartOnlineGameView, JoinOnlineGameAsLeftView, JoinOnlineGameAsRightView
 from .views.gameTournament import CreateTournamentView, CreateTournamentGameSessionView, StartTournamentGameSessionView, TournamentBracketView, TournamentNextGameView
 import logging
@@ -91,4 +92,7 @@ urlpatterns = [
     # See game results
     path('game_results/<uuid:game_id>/', GameResultsView.as_view(), name='get_local_results'),
     path('get_game_status/<uuid:game_id>/', GetGameStatusView.as_view(), name='get_game_status'),
+
+    # Statistiques internes (staff)
+    path('internal_stats/', GameStatsView.as_view(), name='internal_stats'),
 ]
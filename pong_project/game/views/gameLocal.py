@@ -138,6 +138,7 @@ from django.template.loader import render_to_string
 from game.models import GameSession, GameParameters
 from game.forms import GameParametersForm
 from game.manager import schedule_game
+from game.game_loop.status_utils import signal_players_ready
 from pong_project.decorators import login_required_json
 from django.utils.translation import gettext_lazy as _
 
@@ -209,6 +210,7 @@ class StartLocalGameView(View):
             session.save()
             
             schedule_game(game_id)
+            signal_players_ready(game_id)
             
             return JsonResponse({'status': 'success', 'message': _(f"Partie {game_id} lancée avec succès.")}, status=200)
         except GameSession.DoesNotExist:
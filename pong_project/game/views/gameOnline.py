@@ -13,6 +13,7 @@ from accounts.models import CustomUser
 from game.models import GameSession, GameInvitation
 from game.forms import GameParametersForm
 from game.manager import schedule_game
+from game.game_loop.status_utils import signal_players_ready
 from django.utils.translation import gettext as _
 
 logger = logging.getLogger(__name__)
@@ -313,6 +314,9 @@ class StartOnlineGameView(View):
             if session.ready_right and session.ready_left:
                 session.status = 'running'
             session.save()
+            if session.ready_right and session.ready_left:
+                # Réveille wait_for_players (game_loop) sans attendre un polling
+                signal_players_ready(game_id)
             logger.debug(f"StartOnlineGameView - Ready: {session.ready_left}-{session.ready_right}")
             return JsonResponse({'status': 'success', 'message': _(f"Partie {game_id} prête pour le joueur {user_role}.")}, status=200)
         except Exception as e:
@@ -0,0 +1,35 @@
+# game/views/gameStats
+import logging
+from django.views import View
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_protect
+from game.stats import read_reports, aggregate_reports
+from game.game_loop.status_utils import sync_r
+
+from pong_project.decorators import login_required_json
+
+# ---- Configuration ----
+logger = logging.getLogger(__name__)
+
+
+@method_decorator(csrf_protect, name='dispatch')
+@method_decorator(login_required_json, name='dispatch')
+class GameStatsView(View):
+    """
+    Statistiques internes (staff) : latence des connexions, frames abandonnées,
+    entrées refusées, cadence des boucles et pool DB, par worker et par partie.
+    ?detail=1 ajoute les rapports bruts de chaque processus.
+    """
+    def get(self, request):
+        if not request.user.is_staff:
+            return JsonResponse({
+                'status': 'error',
+                'message': "Accès réservé au staff."
+            }, status=403)
+
+        reports = read_reports(sync_r)
+        data = aggregate_reports(reports)
+        if request.GET.get('detail') == '1':
+            data['reports'] = reports
+        return JsonResponse(dict(data, status='success'), status=200)
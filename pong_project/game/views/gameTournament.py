@@ -16,6 +16,7 @@ from django.utils.translation import gettext_lazy as _
 from game.forms import TournamentParametersForm
 from game.models import LocalTournament, GameSession, GameParameters
 from game.manager import schedule_game
+from game.game_loop.status_utils import signal_players_ready
 
 logger = logging.getLogger(__name__)
 
@@ -202,6 +203,7 @@ class StartTournamentGameSessionView(View):
             session.ready_left = True
             session.ready_right = True
             session.save()
+            signal_players_ready(session.id)
             return JsonResponse({'status': 'success', 'message': _(f"Partie {game_id} lancée avec succès.")}, status=200)
         except Exception as e:
             return JsonResponse({'status': 'error', 'message': 'Internal server error'}, status=500)
@@ -3,11 +3,13 @@
 import os
 import django
 import asyncio
-from channels.routing import ProtocolTypeRouter, URLRouter
+from channels.routing import ProtocolTypeRouter, URLRouter, ChannelNameRouter
 from django.core.asgi import get_asgi_application
 from channels.auth import AuthMiddlewareStack
 from game.manager import set_global_loop
 import game.routing  # Assure-toi que ce chemin est correct
+from game.consumers import GameWorkerConsumer
+from game.sharding import worker_channels
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pong_project.settings')
 django.setup()
@@ -40,4 +42,8 @@ application = ProtocolTypeRouter({
         )
     ),
     "lifespan": LifespanHandler(),
+    # Game workers (runworker game-worker-<i>), si settings.GAME_WORKERS > 0
+    "channel": ChannelNameRouter({
+        name: GameWorkerConsumer.as_asgi() for name in worker_channels()
+    }),
 })
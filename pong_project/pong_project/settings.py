@@ -238,4 +238,27 @@ LOGIN_URL = '/home/'
 # ------------------------------------------------------------------
 # Ces variables permettent à d'autres modules (ex : vos consumers) d'accéder à la configuration Redis.
 REDIS_HOST = os.environ.get("REDIS_HOST")
-REDIS_PORT = int(os.environ.get("REDIS_PORT"))
\ No newline at end of file
+REDIS_PORT = int(os.environ.get("REDIS_PORT"))
+# ------------------------------------------------------------------
+# 17) Moteur de jeu
+# ------------------------------------------------------------------
+# True : un seul ticker par worker avance toutes les parties (game/game_loop/engine.py)
+# False : une tâche asyncio par partie (comportement historique)
+GAME_BATCHED_ENGINE = os.environ.get("GAME_BATCHED_ENGINE", "False").lower() in ("true", "1", "yes")
+# True (avec GAME_BATCHED_ENGINE) : physique de toutes les parties dans des tableaux NumPy
+# (game/game_loop/vectorized.py), résultats identiques au chemin scalaire
+GAME_VECTORIZED_PHYSICS = os.environ.get("GAME_VECTORIZED_PHYSICS", "False").lower() in ("true", "1", "yes")
+# Nombre de processus "game worker" (0 : les parties tournent dans le processus uvicorn).
+# Chaque worker se lance avec : python manage.py runworker game-worker-<i>  (i de 0 a GAME_WORKERS-1)
+# Les parties leur sont réparties par hachage cohérent du game_id (game/sharding.py).
+GAME_WORKERS = int(os.environ.get("GAME_WORKERS", "0"))
+# Threads (et donc connexions Postgres) du pool dédié aux requêtes de la boucle de jeu
+# (game/game_loop/db_executor.py), séparé du thread unique des vues synchrones
+GAME_DB_THREADS = int(os.environ.get("GAME_DB_THREADS", "4"))
+# Ticks de simulation par seconde. La détection de collision est continue
+# (game/game_loop/collisions.py) : 60 ou moins allège le CPU sans balle qui
+# traverse une raquette. Les vitesses restent exprimées en px par 1/90 s.
+GAME_TICK_RATE = int(os.environ.get("GAME_TICK_RATE", "90"))
+# Frames game_state envoyées par seconde (plafonné a GAME_TICK_RATE).
+# Surchargé par partie avec GameParameters.broadcast_rate.
+GAME_BROADCAST_RATE = int(os.environ.get("GAME_BROADCAST_RATE", "45"))
@@ -16,7 +16,9 @@ import { isTouchDevice } from '../tools/utility.js';
 
 export async function launchLiveGameWithOptions(gameId, userRole, urlStartButton) {
   const protocol = (window.location.protocol === 'https:') ? 'wss:' : 'ws:';
-  const wsUrl = `${protocol}//${window.location.host}/ws/pong/${gameId}/`;
+  // JSON par défaut ; frames game_state binaires (voir decodeGameState) sur demande
+  const query = binaryFramesEnabled() ? '?proto=bin' : '';
+  const wsUrl = `${protocol}//${window.location.host}/ws/pong/${gameId}/${query}`;
 
   let startGameSelector = null;
   let onStartGame = null;
@@ -77,6 +79,84 @@ export async function launchLiveGameWithOptions(gameId, userRole, urlStartButton
 
 
 
+// ========== Frames game_state binaires (?proto=bin) ==========
+
+// Même disposition que game/game_loop/wire.py (little-endian) : les deux doivent rester synchronisés.
+const WIRE_ORB_TYPES = ['invert', 'shrink', 'ice', 'speed', 'flash', 'sticky'];
+const WIRE_FLAG_FLASH = 0x01;
+
+// Interpolation : le serveur simule a 90 Hz mais n'envoie que 30 a 90 frames/s.
+// On affiche l'état tel qu'il était INTERP_DELAY ms plus tôt (horloge serveur,
+// champ 't' des frames), entre les deux frames qui encadrent cet instant.
+const INTERP_DELAY = 50;        // ms, au moins un intervalle d'envoi a 30 Hz
+const INTERP_BUFFER_SIZE = 32;  // frames gardées
+const INTERP_SNAP_DISTANCE = 100; // px : au-delà (balle remise au centre...), pas d'interpolation
+const INTERP_FIELDS = ['ball_x', 'ball_y', 'paddle_left_y', 'paddle_right_y'];
+
+// Synchronisation d'horloge (ping/pong, voir PongConsumer.handle_ping)
+const PING_INTERVAL = 2000;  // ms
+const CLOCK_SAMPLES = 8;     // mesures gardées, on retient celle de plus petit RTT
+
+// Opt-in : localStorage.setItem('binary_frames', '1'), et seulement si le navigateur a DataView
+function binaryFramesEnabled() {
+  return typeof DataView !== "undefined"
+    && typeof localStorage !== "undefined"
+    && localStorage.getItem('binary_frames') === '1';
+}
+
+function decodeGameState(buffer) {
+  const view = new DataView(buffer);
+  const flags = view.getUint8(1);
+  const data = {
+    type: 'game_state',
+    keyframe: true,  // le format binaire transporte toujours l'état complet
+    seq: view.getUint32(2, true),
+    tick: view.getUint32(6, true),
+    t: view.getFloat64(10, true),
+    ball_x: view.getFloat32(18, true),
+    ball_y: view.getFloat32(22, true),
+    ball_speed_x: view.getFloat32(26, true),
+    ball_speed_y: view.getFloat32(30, true),
+    ball_size: view.getUint8(34),
+    paddle_left_y: view.getFloat32(35, true),
+    paddle_right_y: view.getFloat32(39, true),
+    paddle_left_height: view.getUint16(43, true),
+    paddle_right_height: view.getUint16(45, true),
+    paddle_width: view.getUint8(47),
+    score_left: view.getUint8(48),
+    score_right: view.getUint8(49),
+    effects: view.getUint16(50, true),
+    input_seq_left: view.getUint32(52, true),
+    input_seq_right: view.getUint32(56, true),
+    flash_effect: (flags & WIRE_FLAG_FLASH) !== 0,
+    powerups: [],
+    bumpers: []
+  };
+
+  let offset = 60;
+  const orbCount = view.getUint8(offset++);
+  for (let i = 0; i < orbCount; i++, offset += 9) {
+    data.powerups.push({
+      type: WIRE_ORB_TYPES[view.getUint8(offset)],
+      x: view.getFloat32(offset + 1, true),
+      y: view.getFloat32(offset + 5, true)
+    });
+  }
+  const bumperCount = view.getUint8(offset++);
+  for (let i = 0; i < bumperCount; i++, offset += 9) {
+    data.bumpers.push({
+      x: view.getFloat32(offset, true),
+      y: view.getFloat32(offset + 4, true),
+      size: view.getUint8(offset + 8)
+    });
+  }
+  const eventsLength = view.getUint16(offset, true);
+  if (eventsLength > 0) {
+    data.events = JSON.parse(new TextDecoder().decode(new Uint8Array(buffer, offset + 2, eventsLength)));
+  }
+  return data;
+}
+
 // ========== La grosse fonction initLiveGame ==========
 
 /**
@@ -618,11 +698,16 @@ if (isTouchDevice()) {
     const socket = new WebSocket(config.wsUrl);
     // stocker le socket pour pouvoir le disconnect en cas de changement de page dans la spa
     window.currentGameSocket = socket;
+    socket.binaryType = 'arraybuffer';
     
+    let pingTimer = null;
     socket.onopen = () => {
       console.log("[live_game_utils] WebSocket connection opened:", config.wsUrl);
+      sendPing();
+      pingTimer = setInterval(sendPing, PING_INTERVAL);
     };
     socket.onclose = () => {
+      clearInterval(pingTimer);
       console.log("[live_game_utils] WebSocket closed (maybe user left the page).");
       // Si ce n’est pas un "game_over", on résout quand même la promesse
       resolve(); 
@@ -649,21 +734,107 @@ if (isTouchDevice()) {
       bumpers: [],
       flash_effect: false
     };
+    // Protocole keyframe + deltas (voir broadcast.py) : un trou dans seq => on redemande l'état complet
+    let lastSeq = 0;
+    // Numéro de séquence des entrées : le serveur renvoie le dernier appliqué (input_seq_left / input_seq_right)
+    let inputSeq = 0;
+    let keyframeRequested = false;
+    function requestKeyframe() {
+      if (!keyframeRequested && socket.readyState === WebSocket.OPEN) {
+        keyframeRequested = true;
+        socket.send(JSON.stringify({ action: 'request_keyframe' }));
+      }
+    }
+    // Frames reçues pour l'interpolation, et décalage horloge serveur - performance.now()
+    // (horloge des frames qui arrivent maintenant : décalage NTP moins la demi-RTT)
+    let snapshots = [];
+    let clockOffset = null;
+    let clockSamples = [];
+    let lastRtt = null;
+    let lastOffset = null;
+    function sendPing() {
+      if (socket.readyState === WebSocket.OPEN) {
+        // Nos dernières mesures repartent au serveur (statistiques de latence)
+        socket.send(JSON.stringify({ action: 'ping', t0: performance.now(), rtt: lastRtt, offset: lastOffset }));
+      }
+    }
+    function handlePong(data) {
+      const t3 = performance.now();
+      const rtt = (t3 - data.t0) - (data.t2 - data.t1);
+      const offset = ((data.t1 - data.t0) + (data.t2 - t3)) / 2;
+      clockSamples.push({ rtt, offset });
+      if (clockSamples.length > CLOCK_SAMPLES) clockSamples.shift();
+      const best = clockSamples.reduce((a, b) => (b.rtt < a.rtt ? b : a));
+      clockOffset = best.offset - best.rtt / 2;
+      lastRtt = rtt;
+      lastOffset = best.offset;
+    }
+    function pushSnapshot(data) {
+      if (typeof data.t !== 'number') return;
+      const offset = data.t - performance.now();
+      // Avant le premier pong : décalage de la frame la moins retardée par le réseau
+      if (clockSamples.length === 0 && (clockOffset === null || offset > clockOffset)) clockOffset = offset;
+      const snapshot = { t: data.t };
+      INTERP_FIELDS.forEach(field => { snapshot[field] = gameState[field]; });
+      snapshots.push(snapshot);
+      if (snapshots.length > INTERP_BUFFER_SIZE) snapshots.shift();
+    }
+    function interpolatedPositions() {
+      if (clockOffset === null || snapshots.length < 2) return gameState;
+      const renderTime = performance.now() + clockOffset - INTERP_DELAY;
+      let i = snapshots.length - 1;
+      while (i > 0 && snapshots[i - 1].t > renderTime) i--;
+      // Plus récent que la dernière frame : on garde la dernière frame ; plus ancien que le buffer : la première
+      if (i === 0 || snapshots[i].t <= renderTime) return snapshots[i];
+      const a = snapshots[i - 1], b = snapshots[i];
+      if (Math.abs(b.ball_x - a.ball_x) > INTERP_SNAP_DISTANCE || Math.abs(b.ball_y - a.ball_y) > INTERP_SNAP_DISTANCE) {
+        return b;
+      }
+      const k = (renderTime - a.t) / (b.t - a.t);
+      const result = {};
+      INTERP_FIELDS.forEach(field => { result[field] = a[field] + (b[field] - a[field]) * k; });
+      return result;
+    }
 	// let showCountdown = false;
     // let countdownNumber = 3;
   
     // 6) Gérer la réception de messages WebSocket
     socket.onmessage = (event) => {
-      const data = JSON.parse(event.data);
-  
+      handleMessage((event.data instanceof ArrayBuffer) ? decodeGameState(event.data) : JSON.parse(event.data));
+    };
+
+    function handleMessage(data) {
       if (data.type === 'game_state') {
+        // Les événements du tick (collisions, spawns, but...) arrivent dans la frame
+        const { events, ...frame } = data;
         // Mémoriser les effets actifs avant maj
         const prevLeft = new Set(activeEffects.left);
         const prevRight = new Set(activeEffects.right);
-        gameState = data;
+        if (frame.keyframe) {
+          gameState = frame;
+          keyframeRequested = false;
+        } else {
+          // Delta : seuls les champs modifiés sont envoyés.
+          // Comme avant, une nouvelle frame efface countdown / scoreMsg.
+          // seq_from : delta fusionné par le serveur (game/mailbox.py), premier seq couvert
+          const firstSeq = (frame.seq_from !== undefined) ? frame.seq_from : frame.seq;
+          if (firstSeq !== lastSeq + 1) {
+            requestKeyframe();
+          }
+          const { countdown, scoreMsg, ...previous } = gameState;
+          gameState = Object.assign(previous, frame);
+        }
+        lastSeq = frame.seq;
+        pushSnapshot(frame);
         // Réinjecter
         activeEffects.left = prevLeft;
         activeEffects.right = prevRight;
+        // Puis les événements, une fois l'état a jour (comme quand ils étaient envoyés a part)
+        if (events) {
+          events.forEach(handleMessage);
+        }
+      } else if (data.type === 'pong') {
+        handlePong(data);
       }  else if (data.type === 'powerup_spawned') {
 		const powerupColor = {
 			'invert': '#FF69B4',
@@ -749,7 +920,7 @@ if (isTouchDevice()) {
           activeEffects[displaySide].delete(data.effect);
         }, data.duration * 1000);
       }
-    };
+    }
   
     // 7) Gérer le clavier : en fonction de userRole
     const keysPressed = {};
@@ -794,7 +965,7 @@ if (isTouchDevice()) {
   
       if (player && direction && !keysPressed[evt.key]) {
         if (socket.readyState === WebSocket.OPEN) {
-          socket.send(JSON.stringify({ action, player, direction }));
+          socket.send(JSON.stringify({ action, player, direction, seq: ++inputSeq }));
         }
         keysPressed[evt.key] = true;
         // console.log(`[live_game_utils] start_move: ${player}, ${direction}`);
@@ -820,7 +991,7 @@ if (isTouchDevice()) {
   
       if (player && keysPressed[evt.key]) {
         if (socket.readyState === WebSocket.OPEN) {
-          socket.send(JSON.stringify({ action, player}));
+          socket.send(JSON.stringify({ action, player, seq: ++inputSeq }));
         }
         keysPressed[evt.key] = false;
         // console.log(`[live_game_utils] stop_move: ${player}`);
@@ -909,6 +1080,9 @@ if (isTouchDevice()) {
         ctx.lineWidth = 2;
         ctx.strokeRect(50,50, canvas.width-100, canvas.height-100);
   
+        // Positions interpolées entre les deux dernières frames
+        const positions = interpolatedPositions();
+
         // Dessin raquettes
         ['left','right'].forEach(side => {
           ctx.save();
@@ -924,11 +1098,11 @@ if (isTouchDevice()) {
           }
           ctx.fillStyle = 'white';
           if (side==='left') {
-            ctx.fillRect(50, gameState.paddle_left_y,
+            ctx.fillRect(50, positions.paddle_left_y,
                         gameState.paddle_width, gameState.paddle_left_height);
           } else {
             ctx.fillRect(canvas.width-50 - gameState.paddle_width, 
-                        gameState.paddle_right_y,
+                        positions.paddle_right_y,
                         gameState.paddle_width, gameState.paddle_right_height);
           }
           ctx.restore();
@@ -937,7 +1111,7 @@ if (isTouchDevice()) {
         // Balle
         ctx.fillStyle = 'white';
         ctx.beginPath();
-        ctx.arc(gameState.ball_x, gameState.ball_y, gameState.ball_size, 0, 2*Math.PI);
+        ctx.arc(positions.ball_x, positions.ball_y, gameState.ball_size, 0, 2*Math.PI);
         ctx.fill();
   
         // Powerups